@@ -38,6 +38,10 @@ def create_app(**kwargs):
     environment = os.environ.get("FLASK_ENV", "production")
     app.config.from_object(config.config_by_name[environment])
 
+    import app.common.utils.json_provider as json_provider
+
+    app.json = json_provider.create_json_provider(app)
+
     if app.config.get("SERVER_IS_ON_PROXY"):
         app.wsgi_app = proxy_fix.ProxyFix(
             app.wsgi_app,
@@ -49,9 +53,13 @@ def create_app(**kwargs):
         )
 
     with app.app_context():
+        import app.common.password_hasher as password_hasher
+
+        runable_app = password_hasher.init_app(app)
+
         import app.database as db
 
-        runable_app = db.init_app(app)
+        runable_app = db.init_app(runable_app)
 
         import app.api as api
 
@@ -74,6 +74,9 @@ def init_app(app: flask.Flask, add_model_to_view: bool = True):
     import app.admin.mail_test as mail_test
 
     admin.add_view(mail_test.Admin_MailTest_View(name="Mail test", endpoint="mail-test"))
+    import app.admin.metrics as metrics
+
+    admin.add_view(metrics.Admin_Metrics_View(name="Metrics", endpoint="metrics"))
 
     # init_app must return app
     return app
@@ -0,0 +1,11 @@
+import flask_admin as fadmin
+
+import app.common.utils.metrics as metrics
+from app.api.response_case import ResourceResponseCase
+
+
+class Admin_Metrics_View(fadmin.BaseView):
+    @fadmin.expose("/", methods=("GET",))
+    def index(self):
+        # Metrics are collected per process, so this shows only the worker that handled this request.
+        return ResourceResponseCase.resource_found.create_response(data={"metrics": metrics.collect()})
@@ -4,29 +4,57 @@ import flask
 import flask_admin as fadmin
 
 import app.api.helper_class as api_class
+import app.common.utils as utils
 import app.database as db_module
 import app.database.jwt as jwt_module
+import app.database.token_revocation as token_revocation
 import app.database.user as user
 from app.api.account.response_case import AccountResponseCase
 from app.api.response_case import CommonResponseCase
 
 db = db_module.db
-redis_db = db_module.redis_db
-RedisKeyType = db_module.RedisKeyType
 
 
 class Admin_TokenRevoke_View(fadmin.BaseView):
     @fadmin.expose("/", methods=("GET",))
     def index(self):
-        user_result = db.session.query(user.User).all()
-        token_result = db.session.query(jwt_module.RefreshToken).all()
-        revoked_dict = {}
-        redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key("*")
-        for k in redis_db.scan_iter(match=redis_key):
-            revoked_dict[k.decode()] = redis_db.get(k.decode()).decode()
+        # Every table is paginated on server, as users, tokens and revocations can be a lot.
+        page_size = min(max(flask.request.args.get("page_size", 50, type=int), 1), 500)
+        pages = {
+            name: max(flask.request.args.get(f"{name}_page", 1, type=int), 1) for name in ("user", "token", "revoked")
+        }
+
+        def get_page_rows(query, page: int) -> tuple[list, bool]:
+            # Get one more row to know if there's a next page, without COUNT(*) on the table.
+            rows = query.offset((page - 1) * page_size).limit(page_size + 1).all()
+            return rows[:page_size], len(rows) > page_size
+
+        user_result, user_has_next = get_page_rows(db.session.query(user.User).order_by(user.User.uuid), pages["user"])
+        token_result, token_has_next = get_page_rows(
+            db.session.query(jwt_module.RefreshToken)
+            .options(db.joinedload(jwt_module.RefreshToken.usertable))
+            .order_by(jwt_module.RefreshToken.jti.desc()),
+            pages["token"],
+        )
+        revoked_total, revoked_page = token_revocation.get_revoked_page((pages["revoked"] - 1) * page_size, page_size)
+        revoked_result = {
+            jti: datetime.datetime.fromtimestamp(expire_time, utils.UTC) if expire_time != float("inf") else None
+            for jti, expire_time in revoked_page
+        }
 
         return self.render(
-            "admin/token_revoke.html", user_result=user_result, token_result=token_result, revoked_result=revoked_dict
+            "admin/token_revoke.html",
+            user_result=user_result,
+            token_result=token_result,
+            revoked_result=revoked_result,
+            revoked_total=revoked_total,
+            pages=pages,
+            page_size=page_size,
+            has_next={
+                "user": user_has_next,
+                "token": token_has_next,
+                "revoked": pages["revoked"] * page_size < revoked_total,
+            },
         )
 
     @fadmin.expose("/", methods=("POST",))
@@ -47,53 +75,33 @@ class Admin_TokenRevoke_View(fadmin.BaseView):
         restapi_version = flask.current_app.config.get("RESTAPI_VERSION")
 
         if not any((("user_uuid" in req_body), ("target_jti" in req_body))):
-            CommonResponseCase.body_required_omitted.create_response(
+            return CommonResponseCase.body_required_omitted.create_response(
                 message="Need user_uuid or target_jti", data={"lacks": ["user_uuid", "target_jti"]}
             )
 
+        do_delete = "do_delete" in req_body
         if "user_uuid" in req_body:
-            # How this goddamn query works?!
-            query_result = (
-                db.session.query(jwt_module.RefreshToken)
-                .join(jwt_module.RefreshToken.usertable, aliased=True)
-                .filter_by(uuid=int(req_body["user_uuid"]))
-                .all()
-            )
-            if not query_result:
+            revoked_jtis = jwt_module.revoke_user_tokens(int(req_body["user_uuid"]), delete=do_delete, db_commit=False)
+            if not revoked_jtis:
                 return AccountResponseCase.user_not_found.create_response(
                     message="User or JWT that mapped to that user not found"
                 )
-
-            for target in query_result:
-                # TODO: set can set multiple at once, so use that method instead
-                redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(target.jti)
-                redis_db.set(redis_key, "revoked", datetime.timedelta(weeks=2))
-
-                if "do_delete" in req_body:
-                    db.session.delete(target)
         else:
-            query_result = (
-                db.session.query(jwt_module.RefreshToken)
-                .filter(jwt_module.RefreshToken.jti == int(req_body["target_jti"]))
-                .first()
+            revoked_jtis = jwt_module.revoke_tokens_by_jti(
+                (int(req_body["target_jti"]),), delete=do_delete, db_commit=False
             )
-            if not query_result:
+            if not revoked_jtis:
                 return AccountResponseCase.refresh_token_invalid.create_response(
                     message="RefreshToken that has such JTI not found"
                 )
 
-            redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(req_body["target_jti"])
-            redis_db.set(redis_key, "revoked", datetime.timedelta(weeks=2))
-
-            if "do_delete" in req_body:
-                db.session.delete(query_result)
-
         if "do_delete" in req_body:
             try:
                 db.session.commit()
             except Exception:
                 db.session.rollback()
                 return CommonResponseCase.db_error.create_response()
+        token_revocation.revoke_jti(*revoked_jtis)
 
         return CommonResponseCase.http_ok.create_response(
             code=301, header=(("Location", f"/api/{restapi_version}/admin/token-revoke"),)
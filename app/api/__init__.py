@@ -19,6 +19,7 @@ def init_app(app: flask.Flask):
     global restapi_version
     restapi_version = app.config.get("RESTAPI_VERSION")
     app.url_map.strict_slashes = False
+    app.request_class = helper_class.Request
 
     allowed_origins: list = [f'https://{app.config.get("SERVER_NAME")}']
     local_client_port = app.config.get("LOCAL_DEV_CLIENT_PORT")
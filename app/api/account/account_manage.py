@@ -110,6 +110,8 @@ class AccountInformationChangeRoute(flask.views.MethodView, api_class.MethodView
                 )
             else:
                 raise err
+        changed_identifiers = {k: getattr(target_user, k) for k in ("id", "nickname") if k in req_body}
+        target_user.forget_available_identifiers(**changed_identifiers)
 
         return AccountResponseCase.user_safe_to_use.create_response(
             data={
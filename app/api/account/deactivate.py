@@ -7,13 +7,12 @@ import app.api.helper_class as api_class
 import app.common.utils as utils
 import app.database as db_module
 import app.database.jwt as jwt_module
+import app.database.token_revocation as token_revocation
 import app.database.user as user_module
 from app.api.account.response_case import AccountResponseCase
 from app.api.response_case import CommonResponseCase
 
 db = db_module.db
-redis_db = db_module.redis_db
-RedisKeyType = db_module.RedisKeyType
 
 
 class AccountDeactivationRoute(flask.views.MethodView, api_class.MethodViewMixin):
@@ -59,23 +58,17 @@ class AccountDeactivationRoute(flask.views.MethodView, api_class.MethodViewMixin
             why_deactivated: str = target_user.why_deactivated.replace("ACCOUNT_DEACTIVATED::", "")
             return AccountResponseCase.user_deactivated.create_response(data={"reason": why_deactivated})
 
-        # Revoke all user tokens
-        target_tokens = (
-            db.session.query(jwt_module.RefreshToken).filter(jwt_module.RefreshToken.user == target_user.uuid).all()
-        )
-        if not target_tokens:
+        # Delete all user tokens, this is committed with deactivation below, and revoked on Redis after that.
+        revoked_jtis = jwt_module.revoke_user_tokens(target_user.uuid, db_commit=False)
+        if not revoked_jtis:
             # No refresh token of target user don't make any sense,
             # how could user get here although user don't have any valid refresh token?
             return CommonResponseCase.server_error.create_response()
-        for token in target_tokens:
-            # TODO: set can set multiple at once, so use that method instead
-            redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(token.jti)
-            redis_db.set(redis_key, "revoked", datetime.timedelta(weeks=2))
-            db.session.delete(token)
 
         target_user.deactivated_at = datetime.datetime.utcnow().replace(tzinfo=utils.UTC)
         target_user.why_deactivated = "ACCOUNT_LOCKED::USER_SELF_LOCKED"
         target_user.deactivated_by_orm = target_user
         db.session.commit()
+        token_revocation.revoke_jti(*revoked_jtis)
 
         return AccountResponseCase.user_deactivate_success.create_response()
@@ -2,23 +2,30 @@ import typing
 
 import flask
 import flask.views
-import sqlalchemy as sql
 
 import app.api.helper_class as api_class
-import app.common.utils as utils
 import app.database as db_module
 import app.database.user as user_module
 from app.api.account.response_case import AccountResponseCase
+from app.api.response_case import CommonResponseCase
 
 db = db_module.db
 
 
+# Batch fields accept a list of candidates, so that signup forms can check multiple values on one request.
+BATCH_FIELD_MAP = {"emails": "email", "ids": "id", "nicknames": "nickname"}
+BATCH_MAX_SIZE = 20
+
+
 class AccountDuplicateCheckRoute(flask.views.MethodView, api_class.MethodViewMixin):
     @api_class.RequestBody(
         optional_fields={
             "email": {"type": "string"},
             "id": {"type": "string"},
             "nickname": {"type": "string"},
+            "emails": {"type": "array"},
+            "ids": {"type": "array"},
+            "nicknames": {"type": "array"},
         }
     )
     def post(self, req_body: dict[str, typing.Any]):
@@ -27,24 +34,32 @@ class AccountDuplicateCheckRoute(flask.views.MethodView, api_class.MethodViewMix
         responses:
             - user_already_used
             - user_safe_to_use
+            - body_bad_semantics
             - server_error
         """
-        field_column_map = {
-            "email": user_module.User.email,
-            "id": user_module.User.id,
-            "nickname": user_module.User.nickname,
-        }
-        check_result = []
-
+        candidates: dict[str, set[str]] = {}
         for field_name, field_value in req_body.items():
-            input_value = utils.normalize(field_value.strip()).lower()
-            if (
-                db.session.query(user_module.User)
-                .filter(sql.func.lower(field_column_map[field_name]) == input_value)
-                .first()
-            ):
-                check_result.append(field_name)
-
-        if check_result:
-            return AccountResponseCase.user_already_used.create_response(data={"duplicate": check_result})
+            column_name = BATCH_FIELD_MAP.get(field_name, field_name)
+            field_values = field_value if field_name in BATCH_FIELD_MAP else [field_value]
+
+            if len(field_values) > BATCH_MAX_SIZE:
+                return CommonResponseCase.body_bad_semantics.create_response(
+                    data={"bad_semantics": ({field_name: "TOO_MANY_VALUES"},)}
+                )
+            if not all(isinstance(z, str) for z in field_values):
+                return CommonResponseCase.body_bad_semantics.create_response(
+                    data={"bad_semantics": ({field_name: "NOT_A_STRING"},)}
+                )
+
+            candidates.setdefault(column_name, set()).update(map(user_module.User.normalize_identifier, field_values))
+
+        # Answer is advisory, unique indexes still reject duplicates on sign-up.
+        used_identifiers = user_module.User.get_used_identifiers(candidates)
+        if used_identifiers:
+            return AccountResponseCase.user_already_used.create_response(
+                data={
+                    "duplicate": [z for z in ("email", "id", "nickname") if z in used_identifiers],
+                    "duplicate_values": {k: sorted(v) for k, v in used_identifiers.items()},
+                }
+            )
         return AccountResponseCase.user_safe_to_use.create_response()
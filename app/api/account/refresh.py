@@ -41,23 +41,14 @@ class AccessTokenIssueRoute(flask.views.MethodView, api_class.MethodViewMixin):
             - refresh_token_invalid
             - access_token_refreshed
         """
-        refresh_token_cookie = flask.request.cookies.get("refresh_token", type=str, default="")
-        if not refresh_token_cookie:
-            return AccountResponseCase.user_not_signed_in.create_response()
-
         try:
-            target_user = (
-                db.session.query(user_module.User)
-                .filter(user_module.User.locked_at.is_(None))
-                .filter(user_module.User.deactivated_at.is_(None))
-                .filter(user_module.User.uuid == refresh_token.user)
-                .first()
-            )
-            if not target_user:
+            # Refresh token cookie is already verified and loaded with its user on RequestHeader.
+            target_user: user_module.User = refresh_token.usertable
+            if not target_user or target_user.locked_at or target_user.deactivated_at:
                 return AccountResponseCase.refresh_token_invalid.create_response()
 
             jwt_data_header, jwt_data_body = jwt_module.refresh_login_data(
-                refresh_token_cookie,
+                refresh_token,
                 req_header.get("User-Agent"),
                 req_header.get("X-Csrf-Token"),
                 req_header.get("X-Client-Token", None),
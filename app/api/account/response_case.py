@@ -113,7 +113,13 @@ class AccountResponseCase(api_class.ResponseCaseCollector):
         data={
             "duplicate": [
                 "",
-            ]
+            ],
+            # Only on duplicate check, lowercased values that are in use
+            "duplicate_values": {
+                "": [
+                    "",
+                ],
+            },
         },
     )
     user_info_mismatch = api_class.Response(
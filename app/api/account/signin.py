@@ -47,7 +47,8 @@ class SignInRoute(flask.views.MethodView, api_class.MethodViewMixin):
             - user_locked
             - user_deactivated
         """
-        account_result, reason = user.User.try_login(req_body["id"], req_body["pw"])
+        # Login record and refresh token are committed together, at the end of this request.
+        account_result, reason = user.User.try_login(req_body["id"], req_body["pw"], db_commit=False)
 
         if account_result is False:
             if reason == "ACCOUNT_NOT_FOUND":
@@ -79,9 +80,16 @@ class SignInRoute(flask.views.MethodView, api_class.MethodViewMixin):
             req_header.get("X-Client-Token", None),
             flask.request.remote_addr,
             flask.current_app.config.get("SECRET_KEY"),
+            db_commit=False,
         )
 
         response_body = {"user": account_result.to_dict()}
         response_body["user"].update(jwt_data_body)
 
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            return CommonResponseCase.db_error.create_response()
+
         return AccountResponseCase.user_signed_in.create_response(header=jwt_data_header, data=response_body)
@@ -1,4 +1,3 @@
-import datetime
 import typing
 
 import flask
@@ -7,11 +6,10 @@ import flask.views
 import app.api.helper_class as api_class
 import app.database as db_module
 import app.database.jwt as jwt_module
+import app.database.token_revocation as token_revocation
 from app.api.account.response_case import AccountResponseCase
 
 db = db_module.db
-redis_db = db_module.redis_db
-RedisKeyType = db_module.RedisKeyType
 
 
 class SignOutRoute(flask.views.MethodView, api_class.MethodViewMixin):
@@ -36,8 +34,7 @@ class SignOutRoute(flask.views.MethodView, api_class.MethodViewMixin):
         if refresh_token:
             revoke_target_jti = refresh_token.jti
             try:
-                redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(revoke_target_jti)
-                redis_db.set(redis_key, "revoked", datetime.timedelta(weeks=2))
+                token_revocation.revoke_jti(revoke_target_jti)
                 print(f"Refresh token {revoke_target_jti} registered on REDIS!")
             except Exception:
                 print("Raised error while registering token from REDIS")
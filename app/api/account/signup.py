@@ -3,10 +3,10 @@ import datetime
 import flask
 import flask.views
 import sqlalchemy as sql
-from passlib.hash import argon2
 
 import app.api.helper_class as api_class
 import app.common.mailgun as mailgun
+import app.common.password_hasher as password_hasher
 import app.common.utils as utils
 import app.database as db_module
 import app.database.jwt as jwt_module
@@ -84,7 +84,7 @@ class SignUpRoute(flask.views.MethodView, api_class.MethodViewMixin):
         new_user.email = req_body["email"]
         new_user.id = req_body["id"]
         new_user.nickname = req_body["nick"]
-        new_user.password = argon2.hash(req_body["pw"])
+        new_user.password = password_hasher.password_hasher.hash(req_body["pw"])
         new_user.pw_changed_at = sql.func.now()
         new_user.last_login_date = sql.func.now()
 
@@ -111,6 +111,7 @@ class SignUpRoute(flask.views.MethodView, api_class.MethodViewMixin):
                 )
             else:
                 raise err
+        user.User.forget_available_identifiers(id=new_user.id, nickname=new_user.nickname, email=new_user.email)
 
         mail_sent = True
         MAIL_ENABLE = flask.current_app.config.get("MAIL_ENABLE")
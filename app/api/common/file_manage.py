@@ -6,15 +6,19 @@ import json
 import pathlib as pt
 import secrets
 import typing
+import urllib.parse
 
 import flask
 import flask.views
 import magic
 import PIL.Image
+import werkzeug.exceptions
+import werkzeug.http
 import werkzeug.utils
 
 import app.api.helper_class as api_class
 import app.common.utils as utils
+import app.common.utils.upload_stream as upload_stream
 import app.database as db_module
 import app.database.jwt as jwt_module
 import app.database.uploaded_file as filedb_module
@@ -24,7 +28,13 @@ db = db_module.db
 current_utctime = lambda: datetime.datetime.now().replace(tzinfo=datetime.timezone.utc)  # noqa
 current_utctimestamp = lambda: int(current_utctime().timestamp())  # noqa
 
-USER_CONTENT_UPLOAD_DIR = pt.Path.cwd() / "user_content" / "uploads"
+USER_CONTENT_UPLOAD_DIR = filedb_module.USER_CONTENT_UPLOAD_DIR
+# Uploads are received here first, on the same filesystem with the blob store so that they can be renamed into place.
+USER_CONTENT_UPLOAD_TEMP_DIR = USER_CONTENT_UPLOAD_DIR / ".tmp"
+# Room for form fields and multipart boundaries on top of FILE_UPLOAD_MAX_SIZE, when checking Content-Length.
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+# File is read by this size when it's sent as base64 in JSON. Multiple of 3, so that chunks encode without padding.
+JSON_MODE_READ_CHUNK_SIZE = 3 * 64 * 1024
 WEB_IMAGE_EXT: dict[str, str] = {
     # suffix : imghdr_result
     "png": "png",
@@ -51,17 +61,35 @@ RESPONSABLE_MIME_TYPE = [
 
 class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
     @staticmethod
-    def is_web_friendly_image(file: typing.Union[str, pt.Path]) -> typing.Optional[bool]:
+    def file_stream_factory(
+        total_content_length: typing.Optional[int],
+        content_type: typing.Optional[str],
+        filename: typing.Optional[str] = None,
+        content_length: typing.Optional[int] = None,
+    ) -> upload_stream.UploadStream:
+        # Reject by Content-Length before receiving any byte of the file, if possible.
+        max_size: int = flask.current_app.config.get("FILE_UPLOAD_MAX_SIZE", 0)
+        if max_size and (
+            (content_length or 0) > max_size or (total_content_length or 0) > max_size + UPLOAD_FORM_OVERHEAD
+        ):
+            raise werkzeug.exceptions.RequestEntityTooLarge()
+
+        return upload_stream.UploadStream(USER_CONTENT_UPLOAD_TEMP_DIR, max_size)
+
+    @staticmethod
+    def is_web_friendly_image(
+        file: typing.Union[str, pt.Path], head: typing.Optional[bytes] = None, extension: typing.Optional[str] = None
+    ) -> typing.Optional[bool]:
         file = pt.Path(file) if isinstance(file, str) else file
 
-        # Check if the file exists and the file extension is web-friendly.
+        # Check if the file exists and the file extension(or given extension) is web-friendly.
         # If not, then we don't need to test this file.
-        if not file.exists() or file.suffix.lower() not in WEB_IMAGE_EXT:
+        if not file.exists() or (extension or file.suffix[1:]).lower() not in WEB_IMAGE_EXT:
             return None
 
-        # Check if the file magic is web-friendly
-        imghdr_result = imghdr.what(file)
-        if imghdr_result.lower() not in WEB_IMAGE_EXT.values():
+        # Check if the file magic is web-friendly, from the first bytes of the file if given
+        imghdr_result = imghdr.what(file, h=head)
+        if not imghdr_result or imghdr_result.lower() not in WEB_IMAGE_EXT.values():
             return False
 
         try:
@@ -71,6 +99,57 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
         except Exception:
             return False
 
+    @staticmethod
+    def create_offload_response(filepath: pt.Path, mimetype: str) -> typing.Optional[flask.Response]:
+        """
+        Returns a response that makes the web server in front send the file, if FILE_SERVE_OFFLOAD is set.
+        The web server handles Range, and the worker is freed right away.
+        Conditional requests must be answered before this, and the web server must send ETag and Last-Modified
+        of this response instead of its own, see docker/nginx/templates/frost.conf.template.
+        """
+        offload_mode: str = flask.current_app.config.get("FILE_SERVE_OFFLOAD", "")
+        if offload_mode not in ("x-accel-redirect", "x-sendfile"):
+            return None
+
+        response = flask.Response(mimetype=mimetype)
+        if offload_mode == "x-accel-redirect":
+            offload_prefix: str = flask.current_app.config.get("FILE_SERVE_OFFLOAD_PREFIX", "/_protected_user_content/")
+            offload_path = filepath.relative_to(filedb_module.USER_CONTENT_DIR).as_posix()
+            response.headers["X-Accel-Redirect"] = urllib.parse.quote(offload_prefix.rstrip("/") + "/" + offload_path)
+        else:
+            response.headers["X-Sendfile"] = str(filepath.resolve())
+        return response
+
+    @staticmethod
+    def set_cache_headers(response: flask.Response, file_db: filedb_module.UploadedFile) -> flask.Response:
+        """
+        Validators come from the DB row, so that a conditional request can be answered without touching the file.
+        commit_id changes on every update of the row, including private flag changes.
+        """
+        response.set_etag(file_db.commit_id)
+        response.last_modified = utils.as_utctime(file_db.modified_at or file_db.created_at)
+        # Same URL returns JSON or the file itself, depending on Accept header
+        response.vary.add("Accept")
+
+        response.cache_control.no_cache = None
+        if file_db.private:
+            # Only the browser of the user may keep it, and it must ask us every time whether it's still allowed.
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = flask.current_app.config.get("FILE_CACHE_PUBLIC_MAX_AGE", 3600)
+        # send_file sets Expires from its own max_age, which must not override ours
+        response.headers.pop("Expires", None)
+        return response
+
+    @staticmethod
+    def iter_base64(filepath: pt.Path) -> typing.Generator[bytes, None, None]:
+        """Yields URL-safe base64 of the file by chunks, which joins into the same result with encoding it at once."""
+        with filepath.open("rb") as fp:
+            while chunk := fp.read(JSON_MODE_READ_CHUNK_SIZE):
+                yield base64.urlsafe_b64encode(chunk)
+
     @staticmethod
     def is_allowed_file(filename: str) -> bool:
         allowed_extensions: list[str] = flask.current_app.config.get("FILE_UPLOAD_ALLOW_EXTENSION", [])
@@ -88,9 +167,11 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
     ):
         """
         description: Returns target file.
-            This returns binary file if request requested Content-Type as `not application/json`
+            This returns binary file if request requested Content-Type as `not application/json`, or `?raw=true` is set.
+            Files larger than FILE_JSON_MODE_MAX_SIZE are not sent in JSON, and redirected to `?raw=true`.
         responses:
             - resource_found
+            - resource_redirect
             - http_forbidden
             - resource_not_found
             - resource_forbidden
@@ -120,29 +201,69 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
         ):
             return ResourceResponseCase.resource_forbidden.create_response()
 
-        filepath = USER_CONTENT_UPLOAD_DIR / str(file_db_result.uploaded_by_id) / file_db_result.filename
+        request_content_type = flask.request.accept_mimetypes
+        request_content_type_list = [ct[0] for ct in list(request_content_type)[:-1]]
+        json_requested = not request_content_type_list or "application/json" in request_content_type_list
+        # ?raw=true always returns the file itself, as JSON clients can't change Accept header on redirect.
+        json_requested = json_requested and flask.request.args.get("raw", "").lower() != "true"
+
+        last_modified = utils.as_utctime(file_db_result.modified_at or file_db_result.created_at)
+        if not json_requested and not werkzeug.http.is_resource_modified(
+            flask.request.environ, etag=file_db_result.commit_id, last_modified=last_modified
+        ):
+            # Client's copy is still valid, so the file doesn't need to be opened or even looked up.
+            return FileManagementRoute.set_cache_headers(flask.Response(status=304), file_db_result)
+
+        filepath = file_db_result.get_path()
         if not filepath.exists():
-            file_db_result.deleted_at = utils.as_utctime(datetime.datetime.now())
+            file_db_result.mark_deleted()
             db.session.commit()
+            if file_db_result.content_hash:
+                filedb_module.FileBlob.collect_garbage(file_db_result.content_hash)
             return ResourceResponseCase.resource_not_found.create_response()
 
-        request_content_type = flask.request.accept_mimetypes
-        request_content_type_list = [ct[0] for ct in list(request_content_type)[:-1]]
-        if not request_content_type_list or "application/json" in request_content_type_list:
+        if json_requested:
+            file_size = filepath.stat().st_size
+            json_mode_max_size: int = flask.current_app.config.get("FILE_JSON_MODE_MAX_SIZE", 0)
+            if json_mode_max_size and file_size > json_mode_max_size:
+                binary_url = flask.url_for(flask.request.endpoint, **flask.request.view_args, raw="true")
+                return ResourceResponseCase.resource_redirect.create_response(
+                    header=(("Location", binary_url),),
+                    message="File is too large to be sent in JSON",
+                )
+
+            # base64 of the file is streamed into the placeholder, so the file is never on memory as a whole.
+            placeholder = secrets.token_hex(16)
             response_body = file_db_result.to_dict()
             response_body.update(
                 {
-                    "size": filepath.stat().st_size,
-                    "data": base64.urlsafe_b64encode(filepath.read_bytes()).decode(),
+                    "size": file_size,
+                    "data": placeholder,
                 }
             )
-            return ResourceResponseCase.resource_found.create_response(
+            return ResourceResponseCase.resource_found.create_streamed_response(
                 data={
                     "file": response_body,
                 },
+                placeholder=placeholder,
+                stream=FileManagementRoute.iter_base64(filepath),
+                stream_size=(file_size + 2) // 3 * 4,
             )
 
-        return flask.send_file(filepath, mimetype=file_db_result.mimetype)
+        if offload_response := FileManagementRoute.create_offload_response(filepath, file_db_result.mimetype):
+            return FileManagementRoute.set_cache_headers(offload_response, file_db_result)
+
+        # conditional=True answers Range and If-Range requests with 206 or 416.
+        response = flask.send_file(
+            filepath,
+            mimetype=file_db_result.mimetype,
+            etag=file_db_result.commit_id,
+            last_modified=last_modified,
+            conditional=True,
+        )
+        # werkzeug only tells this on 206, but clients need to know it on the first download to resume it later.
+        response.accept_ranges = "bytes"
+        return FileManagementRoute.set_cache_headers(response, file_db_result)
 
     @api_class.RequestHeader(auth={api_class.AuthType.Bearer: True})
     @api_class.RequestBody(optional_fields={"private": {"type": "boolean"}, "alt_data": {"type": "string"}})
@@ -179,6 +300,8 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
             return CommonResponseCase.body_empty.create_response(
                 message="File is not included on the request",
             )
+        # File is already received, hashed and counted by file_stream_factory.
+        uploaded_stream: upload_stream.UploadStream = file.stream
 
         filename = utils.normalize(file.filename).encode("ascii", "backslashreplace").decode()
         filename = werkzeug.utils.secure_filename(filename)
@@ -199,14 +322,8 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
             )
         filename += f".{fileext}"
 
-        filepath = USER_CONTENT_UPLOAD_DIR / str(access_token.user) / filename
-        if not filepath.parent.exists():
-            filepath.parent.mkdir(parents=True)
-
-        file.save(filepath)
-
         check_web_friendly_img = flask.current_app.config.get("FILE_UPLOAD_IMAGE_WEB_FRIENDLY_CHECK", False)
-        detected_file_magic = magic.from_file(filepath, mime=True)
+        detected_file_magic = magic.from_buffer(bytes(uploaded_stream.head), mime=True)
         # Examine mimetype and check web-friendly if needed
         file_err_reason: str = ""
         if file.mimetype != detected_file_magic:
@@ -214,12 +331,14 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
                 "The MIME type we guessed from the file you sent " "does not match the MIME type you reported."
             )
         elif detected_file_magic.startswith("image/") and check_web_friendly_img:
-            web_img_check_result = FileManagementRoute.is_web_friendly_image(filepath)
+            web_img_check_result = FileManagementRoute.is_web_friendly_image(
+                uploaded_stream.path, bytes(uploaded_stream.head), fileext
+            )
             if web_img_check_result is not None and not web_img_check_result:
                 # Image is not web-friendly or broken.
                 file_err_reason = "Image you uploaded is broken, or Image is not web-friendly."
         if file_err_reason:
-            filepath.unlink(missing_ok=True)
+            uploaded_stream.close()
             return CommonResponseCase.body_bad_semantics.create_response(
                 data={
                     "bad_semantics": [
@@ -243,14 +362,24 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
         new_file_db = filedb_module.UploadedFile()
         new_file_db.uploaded_by_id = access_token.user
         new_file_db.mimetype = detected_file_magic
-        new_file_db.size = filepath.stat().st_size
+        new_file_db.size = uploaded_stream.size
         new_file_db.filename = filename
         new_file_db.original_filename = file.filename
+        new_file_db.content_hash = uploaded_stream.hexdigest()
 
         new_file_db.alternative_data = alt_data
         new_file_db.private = req_body.get("private", False)
 
         db.session.add(new_file_db)
+
+        # Reference the content before placing its file, see FileBlob.collect_garbage
+        filedb_module.FileBlob.add_reference(new_file_db.content_hash, new_file_db.size)
+        blob_path = filedb_module.get_blob_path(new_file_db.content_hash)
+        if blob_path.exists():
+            # Same content is already stored
+            uploaded_stream.close()
+        else:
+            uploaded_stream.save(blob_path)
         db.session.commit()
 
         # Return created file data
@@ -292,12 +421,14 @@ class FileManagementRoute(flask.views.MethodView, api_class.MethodViewMixin):
         if not access_token.is_admin() and file_db_result.uploaded_by_id != access_token.user:
             return ResourceResponseCase.resource_forbidden.create_response()
 
-        file_db_result.deleted_at = utils.as_utctime(datetime.datetime.now())
-        file_db_result.deleted_by_id = access_token.user
+        file_db_result.mark_deleted(access_token.user)
         db.session.commit()
 
-        filepath = USER_CONTENT_UPLOAD_DIR / str(file_db_result.uploaded_by_id) / file_db_result.filename
-        filepath.unlink(missing_ok=True)
+        if file_db_result.content_hash:
+            # Remove the content only if no other file refers it
+            filedb_module.FileBlob.collect_garbage(file_db_result.content_hash)
+        else:
+            file_db_result.get_path().unlink(missing_ok=True)
         return ResourceResponseCase.resource_deleted.create_response()
 
 
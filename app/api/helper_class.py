@@ -6,6 +6,7 @@ import enum
 import functools
 import inspect
 import json
+import secrets
 import types
 import typing
 import unicodedata
@@ -13,62 +14,12 @@ import unicodedata
 import flask
 import jwt.exceptions
 import werkzeug.datastructures as wz_dt
+import werkzeug.exceptions
 import yaml
 
-POSSIBLE_DATETIME_FORMAT = [
-    "%d-%b-%Y",
-    "%d-%m-%Y",
-    "%d.%m.%Y",
-    "%d/%m/%Y",
-    "%Y-%m-%d",
-    "%Y.%m.%d",
-    "%Y/%m/%d",
-    "before %b-%Y",
-    "before %Y%m%d",
-    "%Y.%m.%d %H:%M:%S",
-    "%Y%m%d %H:%M:%S",
-    "%Y-%m-%d %H:%M:%S",
-    "%Y-%m-%d %H:%M:%S%z",
-    "%Y-%m-%d %H:%M:%S %z",
-    "%Y-%m-%d %H:%M:%S CLST",
-    "%Y-%m-%d %H:%M:%S.%f",
-    "%d.%m.%Y  %H:%M:%S",
-    "%d-%b-%Y %H:%M:%S %Z",
-    "%Y/%m/%d %H:%M:%S (%z)",
-    "%Y/%m/%d %H:%M:%S",
-    "%a %b %d %H:%M:%S %Z %Y",
-    "%a %b %d %Y",
-    "%Y-%m-%dT%H:%M:%S",
-    "%Y-%m-%dT%H:%M:%SZ",
-    "%Y-%m-%dt%H:%M:%S.%fz",
-    "%Y-%m-%dT%H:%M:%S%z",
-    "%Y-%m-%dT%H:%M:%S.%f%z",
-    "%Y-%m-%dt%H:%M:%S.%f",
-    "%Y-%m-%dt%H:%M:%S",
-    "%Y-%m-%dt%H:%M:%SZ",
-    "%Y-%m-%dt%H:%M:%S.%fz",
-    "%Y-%m-%dt%H:%M:%S%z",
-    "%Y-%m-%dt%H:%M:%S.%f%z",
-    "%Y%m%d",
-    "%Y. %m. %d.",
-    "before %b-%Y",
-    "%a %d %b %Y",
-    "%A %d %b %Y",
-    "%a %d %B %Y",
-    "%A %d %B %Y",
-    "%Y-%m-%d %H:%M:%S (%Z+0:00)",
-    "%d-%m-%Y %H:%M:%S %Z+1",
-    "%B %d %Y",
-    "%Y-%b-%d",
-    "%d/%m/%Y %H:%M:%S",
-    "%m/%d/%Y",
-    "%d %b %Y",
-    "%d-%b-%Y %H:%M:%S",
-    "%Y%m%d%H%M%S",
-    "%Y-%m-%d %H:%M:%S (%Z%z)",
-    "%d %B %Y at %H:%M:%S.%f",
-    "%Y-%m-%d %H:%M:%S.%f %Z",
-]
+import app.common.utils.datetime_parser as datetime_parser
+
+POSSIBLE_DATETIME_FORMAT = datetime_parser.POSSIBLE_DATETIME_FORMAT
 BASE_TYPE = typing.Type[typing.Union[str, bool, int, float, list, dict, datetime.datetime]]
 BASE_TYPE_WITHOUT_DATETIME = typing.Type[typing.Union[str, bool, int, float, list, dict]]
 openapi_type_def: dict[BASE_TYPE, str] = {
@@ -90,6 +41,7 @@ openapi_type_def_inverse: dict[str, BASE_TYPE_WITHOUT_DATETIME] = {
     "object": dict,
 }
 http_all_method = ["get", "head", "post", "put", "delete", "connect", "options", "trace", "patch"]
+FORM_MIMETYPES = ("multipart/form-data", "application/x-www-form-urlencoded")
 ResponseType = tuple[typing.Any, int, typing.Iterable[tuple[str]]]
 
 
@@ -236,6 +188,95 @@ class Response:
                 "example": flask.render_template(self.template_path, **self.data),
             }
 
+    # Pre-encoded JSON envelopes and headers of this response case, rendered once per process.
+    # Key is (BACKEND_NAME, debug mode, message) for envelopes, and (BACKEND_NAME, debug mode) for headers.
+    # Only the envelope of the case's own message is cached, messages given on create_response are rendered each time.
+    _envelope_cache: dict[tuple, tuple[bytes, bytes, bool]] = dataclasses.field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _header_cache: dict[tuple, list[tuple[str, str]]] = dataclasses.field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def get_header(self, server_name: str, header: typing.Iterable[tuple[str, str]] = ()) -> list[tuple[str, str]]:
+        resp_header = [z for z in (header or self.header) if z[0] and z[1]]
+        if resp_header:
+            resp_header_name = [z[0] for z in resp_header]
+            resp_header.append(("Access-Control-Expose-Headers", ", ".join(resp_header_name)))
+        resp_header.append(("Server", server_name))
+        return resp_header
+
+    def get_envelope(self, message: str) -> tuple[bytes, bytes, bool]:
+        """
+        Returns (prefix, suffix, is_pretty) of JSON envelope, so that the response body is prefix + data + suffix.
+        The envelope is rendered by flask.jsonify, so the output is same with jsonify-ing the whole body.
+        """
+        placeholder = f'"{secrets.token_hex(16)}"'
+        envelope: bytes = flask.jsonify(
+            {
+                "success": self.success,
+                "code": self.code,
+                "sub_code": self.public_sub_code,
+                "message": message,
+                "data": placeholder[1:-1],
+            }
+        ).get_data()
+        prefix, suffix = envelope.split(placeholder.encode())
+        return prefix, suffix, b"\n" in prefix
+
+    def get_cached_header(
+        self, server_name: str, cache_key: tuple, header: typing.Iterable[tuple[str, str]] = ()
+    ) -> list[tuple[str, str]]:
+        if header:
+            return self.get_header(server_name, header)
+        if (resp_header := self._header_cache.get(cache_key, None)) is None:
+            resp_header = self._header_cache[cache_key] = self.get_header(server_name)
+        return resp_header
+
+    def create_streamed_response(
+        self,
+        data: dict,
+        placeholder: str,
+        stream: typing.Iterable[bytes],
+        stream_size: typing.Optional[int] = None,
+        code: int = None,
+        header: typing.Iterable[tuple[str, str]] = (),
+        message: typing.Optional[str] = None,
+    ) -> ResponseType:
+        """
+        Returns a JSON response that has the placeholder string in data replaced with the chunks of stream,
+        so that a large value can be sent without building it on memory.
+        Chunks are written in the JSON string as they are, so they must not need escaping, like base64 does.
+        """
+        current_app = flask.current_app
+        server_name: str = current_app.config.get("BACKEND_NAME", "Backend Core")
+        resp_code: int = code if code is not None else self.code
+        resp_header = self.get_cached_header(server_name, (server_name, current_app.debug), header)
+
+        # Only the small part around the streamed value is encoded, and it's split at the placeholder.
+        body: bytes = flask.jsonify(
+            {
+                "success": self.success,
+                "code": self.code,
+                "sub_code": self.public_sub_code,
+                "message": message or self.message,
+                "data": data,
+            }
+        ).get_data()
+        prefix, suffix = body.split(placeholder.encode(), 1)
+
+        def generate() -> typing.Generator[bytes, None, None]:
+            yield prefix
+            yield from stream
+            yield suffix
+
+        response = current_app.response_class(
+            generate(), status=resp_code, headers=resp_header, mimetype=current_app.json.mimetype
+        )
+        if stream_size is not None:
+            response.content_length = len(prefix) + stream_size + len(suffix)
+        return (response, resp_code, ())
+
     def create_response(
         self,
         code: int = None,
@@ -245,46 +286,61 @@ class Response:
         template_path: str = "",
         content_type: str = "",
     ) -> ResponseType:
-        if data is None:
-            data = {}
+        current_app = flask.current_app
+        server_name: str = current_app.config.get("BACKEND_NAME", "Backend Core")
+        cache_key = (server_name, current_app.debug)
 
         resp_code: int = code if code is not None else self.code
-
-        resp_header = [z for z in (header or self.header) if z[0] and z[1]]
-        if resp_header:
-            resp_header_name = [z[0] for z in resp_header]
-            resp_header.append(("Access-Control-Expose-Headers", ", ".join(resp_header_name)))
-
-        result_header: wz_dt.MultiDict = wz_dt.MultiDict(
-            (
-                *resp_header,
-                ("Server", flask.current_app.config.get("BACKEND_NAME", "Backend Core")),
-            )
-        )
-
-        resp_data = copy.deepcopy(data)
+        resp_header = self.get_cached_header(server_name, cache_key, header)
 
         resp_template_path = template_path or self.template_path
         resp_content_type = content_type or self.content_type
 
         if resp_content_type == "application/json":
             # TODO: Parse YAML file and get response message using public_sub_code
-            response_body = {
-                "success": self.success,
-                "code": self.code,
-                "sub_code": self.public_sub_code,
-                "message": message or self.message,
-                "data": resp_data,
-            }
+            resp_message = message or self.message
+            if resp_message == self.message:
+                envelope_cache_key = (*cache_key, resp_message)
+                if (envelope := self._envelope_cache.get(envelope_cache_key, None)) is None:
+                    envelope = self._envelope_cache[envelope_cache_key] = self.get_envelope(resp_message)
+            else:
+                envelope = self.get_envelope(resp_message)
+            prefix, suffix, is_pretty = envelope
+
+            # Responses that carry no dynamic data are just a pre-encoded envelope,
+            # and the others only need to encode the data payload.
+            if data is None or (isinstance(data, dict) and not data):
+                resp_body = prefix + b"{}" + suffix
+            elif is_pretty:
+                # Data must be indented with the envelope on debug mode, so jsonify the whole body.
+                resp_body = flask.jsonify(
+                    {
+                        "success": self.success,
+                        "code": self.code,
+                        "sub_code": self.public_sub_code,
+                        "message": resp_message,
+                        "data": data,
+                    }
+                ).get_data()
+            else:
+                resp_body = prefix + current_app.json.dumpb(data) + suffix
 
-            return (flask.jsonify(response_body), resp_code, result_header)
+            return (
+                current_app.response_class(
+                    resp_body, status=resp_code, headers=resp_header, mimetype=current_app.json.mimetype
+                ),
+                resp_code,
+                (),
+            )
         elif resp_content_type == "text/html":
             if not resp_template_path:
                 raise Exception("template_path must be set when content_type is 'text/html'")
+            if data is None:
+                data = {}
             return (
-                flask.render_template(resp_template_path, **(resp_data if isinstance(resp_data, dict) else {})),
+                flask.render_template(resp_template_path, **(data if isinstance(data, dict) else {})),
                 resp_code,
-                result_header,
+                wz_dt.MultiDict(resp_header),
             )
         else:
             raise NotImplementedError(f"Response type {resp_content_type} is not supported.")
@@ -371,6 +427,16 @@ class MethodViewMixin(AutoRegisterClass):
         return CommonResponseCase.http_ok.create_response(header=result_header)
 
 
+class Request(flask.Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Views can receive uploaded files on their own stream by defining file_stream_factory,
+        # e.g. to process the file while it's being received.
+        view_func = flask.current_app.view_functions.get(self.endpoint, None)
+        if file_stream_factory := getattr(getattr(view_func, "view_class", None), "file_stream_factory", None):
+            return file_stream_factory(total_content_length, content_type, filename, content_length)
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
 class AuthType(enum.Enum):
     Bearer = enum.auto()
     RefreshToken = enum.auto()
@@ -458,48 +524,136 @@ def json_dict_filter(in_dict: dict[str, int | float | bool | dict | list], filte
 def dict_type_check(
     type_def: dict[str, dict[str, str]], data: dict[str, typing.Any]
 ) -> typing.Optional[tuple[str, str, str]]:
-    type_def_rtypes = {k: openapi_type_def_inverse[v["type"]] for k, v in type_def.items()}
-    data_for_iter = copy.deepcopy(data)
-
-    for data_k, data_v in data_for_iter.items():
-        expected_type = type_def_rtypes.get(data_k, None)
-
-        if not expected_type:
-            return (data_k, "UNKNOWN", "UNKNOWN")
-
-        if expected_type is str:
-            if not isinstance(data_v, str):
-                data[data_k] = str(data_v)
-
-        elif not isinstance(data_v, expected_type):
-            if isinstance(data_v, str):
-                # If field's type is str, then at least we can try conversion.
-                with contextlib.suppress(Exception):
-                    data_v_parsed = json.loads(data_v)
-                    if issubclass(expected_type, (int, float)) and isinstance(data_v_parsed, (int, float)):
-                        data[data_k] = expected_type(data_v_parsed)
-                        continue
-                    elif isinstance(data_v_parsed, str):
-                        # Try to parse string as datetime.
-                        # This might slow, but I had to do this.
-                        result: str | datetime.datetime = data_v_parsed
-                        for format in POSSIBLE_DATETIME_FORMAT:
-                            try:
-                                result = datetime.datetime.strptime(data_v_parsed, format)
-                                break
-                            except ValueError:
-                                continue
-                        data[data_k] = result
-                    elif isinstance(data_v_parsed, expected_type):
-                        data[data_k] = expected_type(data_v_parsed)
-                        continue
-
-            # Field name / Expected type / Type we got
-            expected_type_openapi_str = openapi_type_def[expected_type]
-            type_we_got = openapi_type_def.get(type(data_v), "UNKNOWN")
-            return (data_k, expected_type_openapi_str, type_we_got)
-
-    return None
+    return FieldValidatorPlan(optional_fields=type_def).type_check(data)
+
+
+# Sentinel value that field coercers return when the value cannot be converted to the expected type.
+TYPE_MISMATCH = object()
+
+
+def create_field_coercer(
+    expected_type: BASE_TYPE_WITHOUT_DATETIME, format: str = ""
+) -> typing.Callable[[typing.Any], typing.Any]:
+    if expected_type is str and format in ("date", "date-time"):
+        # String field that holds datetime, e.g. {"type": "string", "format": "date-time"}
+        def datetime_coercer(value: typing.Any) -> typing.Any:
+            result = datetime_parser.parse_datetime(value) if isinstance(value, str) else None
+            return result if result is not None else TYPE_MISMATCH
+
+        return datetime_coercer
+
+    if expected_type is str:
+        return lambda value: value if isinstance(value, str) else str(value)
+
+    def coercer(value: typing.Any) -> typing.Any:
+        if isinstance(value, expected_type):
+            return value
+
+        if isinstance(value, str):
+            # If field's type is str, then at least we can try conversion.
+            with contextlib.suppress(Exception):
+                value_parsed = json.loads(value)
+                if issubclass(expected_type, (int, float)) and isinstance(value_parsed, (int, float)):
+                    return expected_type(value_parsed)
+                elif isinstance(value_parsed, expected_type):
+                    return expected_type(value_parsed)
+
+        return TYPE_MISMATCH
+
+    return coercer
+
+
+class FieldValidatorPlan:
+    """
+    Validation plan of request fields.
+    This is compiled once when the view is decorated,
+    so that the per-request path only needs a single pass over the request data.
+    """
+
+    def __init__(
+        self,
+        required_fields: typing.Optional[dict[str, dict[str, str]]] = None,
+        optional_fields: typing.Optional[dict[str, dict[str, str]]] = None,
+    ):
+        required_fields = required_fields or {}
+        optional_fields = optional_fields or {}
+
+        self.required: tuple[str, ...] = tuple(required_fields)
+        self.allowed: frozenset[str] = frozenset((*required_fields, *optional_fields))
+        # Lacks report when nothing is given, which is the most common case of the omission.
+        self.all_lacks: tuple[str, ...] = self.required
+
+        self.expected_types: dict[str, str] = {}
+        self.coercers: dict[str, typing.Callable[[typing.Any], typing.Any]] = {}
+        for field_name, field_def in {**required_fields, **optional_fields}.items():
+            expected_type = openapi_type_def_inverse.get(field_def.get("type", ""), None)
+            if not expected_type:
+                raise ValueError(f"Field `{field_name}` has an unknown type `{field_def.get('type', '')}`")
+            field_format: str = field_def.get("format", "")
+            self.expected_types[field_name] = field_def["type"] + (f"({field_format})" if field_format else "")
+            self.coercers[field_name] = create_field_coercer(expected_type, field_format)
+
+    def collect(self, in_dict: typing.Any, filter_empty_value: bool = True) -> dict[str, typing.Any]:
+        """
+        Filter for empty keys and values, and remove every field not in required and optional fields.
+        Values of the fields we don't need won't be examined at all.
+        """
+        result_dict: dict = {}
+        if not in_dict:
+            return result_dict
+
+        for k, v in in_dict.items():
+            res_key: str = (k if k.isascii() else unicodedata.normalize("NFC", k)).strip()
+            if res_key not in self.allowed:
+                continue
+
+            res_value = None
+            if isinstance(v, str):
+                res_value = (v if v.isascii() else unicodedata.normalize("NFC", v)).strip()
+                if filter_empty_value and not res_value:
+                    continue
+            elif isinstance(v, (int, float)):
+                res_value = v
+            elif isinstance(v, dict):
+                res_value = json_dict_filter(v, filter_empty_value)  # type: ignore
+                if filter_empty_value and not res_value:
+                    continue
+            elif isinstance(v, list):
+                res_value = json_list_filter(v, filter_empty_value)  # type: ignore
+                if filter_empty_value and not res_value:
+                    continue
+            elif v is None:
+                if filter_empty_value:
+                    continue
+            else:
+                raise Exception("This is not a valid dict of parsed json.")
+
+            result_dict[res_key] = res_value
+
+        return result_dict
+
+    def lacks(self, data: dict[str, typing.Any]) -> list[str]:
+        if not data:
+            return list(self.all_lacks)
+        return [z for z in self.required if z not in data]
+
+    def type_check(self, data: dict[str, typing.Any]) -> typing.Optional[tuple[str, str, str]]:
+        """
+        Converts values of data in place to the type that each field expects.
+        Returns (Field name, Expected type, Type we got) of the first mismatched field, or None.
+        """
+        for data_k, data_v in data.items():
+            coercer = self.coercers.get(data_k, None)
+            if not coercer:
+                return (data_k, "UNKNOWN", "UNKNOWN")
+
+            coerced_value = coercer(data_v)
+            if coerced_value is TYPE_MISMATCH:
+                # Field name / Expected type / Type we got
+                return (data_k, self.expected_types[data_k], openapi_type_def.get(type(data_v), "UNKNOWN"))
+            data[data_k] = coerced_value
+
+        return None
 
 
 class RequestHeader:
@@ -509,7 +663,6 @@ class RequestHeader:
         optional_fields: typing.Optional[dict[str, dict[str, str]]] = None,
         auth: typing.Optional[dict[AuthType, bool]] = None,
     ):
-        self.req_header: dict = {}
         self.required_fields: dict[str, dict[str, str]] = required_fields or {}
         self.optional_fields: dict[str, dict[str, str]] = optional_fields or {}
         self.auth: dict[AuthType, bool] = auth or {}
@@ -535,35 +688,22 @@ class RequestHeader:
 
     def __call__(self, func: typing.Callable):  # noqa: C901
         # TODO: This method is too complex! (complexity=42)
+        plan = FieldValidatorPlan(self.required_fields, self.optional_fields)
+
+        # This decorator object is shared by every concurrent request(thread/greenlet) on the view,
+        # so parsed request data must live only in the local scope of the wrapper, not on self.
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
-                # Filter for empty keys and values
-                self.req_header = json_dict_filter(flask.request.headers, True)
+                # Filter for empty keys and values, and remove every field not in required and optional fields
+                req_header = plan.collect(flask.request.headers)
 
                 # Check if all required fields are in
-                if not all([z in self.req_header.keys() for z in self.required_fields]):
-                    return CommonResponseCase.header_required_omitted.create_response(
-                        data={
-                            "lacks": [z for z in self.required_fields if z not in self.req_header],
-                        }
-                    )
-
-                # Remove every field not in required and optional fields
-                self.req_header = {
-                    k: self.req_header[k]
-                    for k in self.req_header
-                    if k in list(self.required_fields.keys()) + list(self.optional_fields.keys())
-                }
-                if self.required_fields and not self.req_header:
-                    return CommonResponseCase.header_required_omitted.create_response(
-                        data={
-                            "lacks": list(self.required_fields.keys()),
-                        }
-                    )
+                if lacks := plan.lacks(req_header):
+                    return CommonResponseCase.header_required_omitted.create_response(data={"lacks": lacks})
 
-                if self.required_fields or self.optional_fields:
-                    kwargs["req_header"] = self.req_header
+                if plan.allowed:
+                    kwargs["req_header"] = req_header
             except Exception:
                 return CommonResponseCase.header_invalid.create_response()
 
@@ -575,7 +715,7 @@ class RequestHeader:
                 for auth, required in self.auth.items():
                     # We need match-case syntax which is introduced on Python 3.10
                     if auth == AuthType.Bearer:
-                        csrf_token = self.req_header.get("X-Csrf-Token", None)
+                        csrf_token = req_header.get("X-Csrf-Token", None)
                         if required and not csrf_token:
                             return account_resp_case.AccountResponseCase.access_token_invalid.create_response()
 
@@ -712,7 +852,6 @@ class RequestQuery:
         required_fields: typing.Optional[dict[str, dict[str, str]]] = None,
         optional_fields: typing.Optional[dict[str, dict[str, str]]] = None,
     ):
-        self.req_query: dict = {}
         self.required_fields: dict[str, dict[str, str]] = required_fields or {}
         self.optional_fields: dict[str, dict[str, str]] = optional_fields or {}
 
@@ -720,42 +859,20 @@ class RequestQuery:
         self.fields.update(self.optional_fields)
 
     def __call__(self, func: typing.Callable):
+        plan = FieldValidatorPlan(self.required_fields, self.optional_fields)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
-                # Filter for empty keys and values
-                self.req_query = json_dict_filter(flask.request.args.copy(), True)
+                # Filter for empty keys and values, and remove every field not in required and optional fields
+                req_query = plan.collect(flask.request.args)
 
                 # Check if all required fields are in
-                if not all([z in self.req_query.keys() for z in self.required_fields]):
-                    return CommonResponseCase.path_required_omitted.create_response(
-                        data={
-                            "lacks": [z for z in self.required_fields if z not in self.req_query],
-                        }
-                    )
+                if lacks := plan.lacks(req_query):
+                    return CommonResponseCase.path_required_omitted.create_response(data={"lacks": lacks})
 
-                # Remove every field not in required and optional fields
-                self.req_query = {
-                    k: self.req_query[k]
-                    for k in self.req_query
-                    if k in list(self.required_fields.keys()) + list(self.optional_fields.keys())
-                }
-
-                # Remove every field not in required and optional fields
-                self.req_query = {
-                    k: self.req_query[k]
-                    for k in self.req_query
-                    if k in list(self.required_fields.keys()) + list(self.optional_fields.keys())
-                }
-                if self.required_fields and not self.req_query:
-                    return CommonResponseCase.path_required_omitted.create_response(
-                        data={
-                            "lacks": list(self.required_fields.keys()),
-                        }
-                    )
-
-                if self.required_fields or self.optional_fields:
-                    kwargs["req_query"] = self.req_query
+                if plan.allowed:
+                    kwargs["req_query"] = req_query
             except Exception:
                 return CommonResponseCase.body_invalid.create_response()
 
@@ -815,7 +932,6 @@ class RequestBody:
         required_fields: typing.Optional[dict[str, dict[str, str]]] = None,
         optional_fields: typing.Optional[dict[str, dict[str, str]]] = None,
     ):
-        self.req_body: dict = {}
         self.required_fields: dict[str, dict[str, str]] = required_fields or {}
         self.optional_fields: dict[str, dict[str, str]] = optional_fields or {}
 
@@ -823,38 +939,29 @@ class RequestBody:
         self.fields.update(self.optional_fields)
 
     def __call__(self, func: typing.Callable):
+        plan = FieldValidatorPlan(self.required_fields, self.optional_fields)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
-                # Filter for empty keys and values
-                self.req_body = None
-                try:
-                    self.req_body = json_dict_filter(flask.request.get_json(force=True), True)
-                except Exception:
-                    # Try to get body data from FormData
-                    self.req_body = json_dict_filter(flask.request.form.to_dict(flat=True), True)
-                if self.req_body is None:
-                    raise Exception("Getting body data from request failed")
+                # Filter for empty keys and values, and remove every field not in required and optional fields
+                if flask.request.mimetype in FORM_MIMETYPES:
+                    # Get body data from FormData without reading the whole body as JSON first,
+                    # so that uploaded files are streamed instead of being held on memory.
+                    req_body = plan.collect(flask.request.form)
+                else:
+                    try:
+                        req_body = plan.collect(flask.request.get_json(force=True))
+                    except Exception:
+                        # Try to get body data from FormData
+                        req_body = plan.collect(flask.request.form)
 
                 # Check if all required fields are in
-                if not all([z in self.req_body.keys() for z in self.required_fields]):
-                    return CommonResponseCase.body_required_omitted.create_response(
-                        data={
-                            "lacks": [z for z in self.required_fields if z not in self.req_body],
-                        },
-                    )
-
-                # Remove every field not in required and optional fields
-                self.req_body = {
-                    k: self.req_body[k]
-                    for k in self.req_body
-                    if k in list(self.required_fields.keys()) + list(self.optional_fields.keys())
-                }
-                if self.required_fields and not self.req_body:
-                    return CommonResponseCase.body_empty.create_response()
+                if lacks := plan.lacks(req_body):
+                    return CommonResponseCase.body_required_omitted.create_response(data={"lacks": lacks})
 
-                # Type check the values
-                req_type_check_result = dict_type_check(self.fields, self.req_body)
+                # Type check and convert the values
+                req_type_check_result = plan.type_check(req_body)
                 if req_type_check_result:
                     field_name, expected_type, type_we_got = req_type_check_result
                     error_msg = f"Expected type `{expected_type}`, but got `{type_we_got}`"
@@ -870,10 +977,12 @@ class RequestBody:
                         },
                     )
 
+            except werkzeug.exceptions.RequestEntityTooLarge:
+                raise
             except Exception:
                 return CommonResponseCase.body_invalid.create_response()
 
-            kwargs["req_body"] = self.req_body
+            kwargs["req_body"] = req_body
             return func(*args, **kwargs)
 
         # Parse docstring and inject requestBody data
@@ -909,7 +1018,7 @@ class RequestBody:
             if self.required_fields:
                 if not doc_data["responses"]:
                     doc_data["responses"] = []
-                doc_data["responses"] += ["body_required_omitted", "body_empty", "body_invalid"]
+                doc_data["responses"] += ["body_required_omitted", "body_invalid"]
 
             func.__doc__ = yaml.safe_dump(doc_data)
             wrapper.__doc__ = yaml.safe_dump(doc_data)
@@ -1,6 +1,7 @@
 import flask
 import werkzeug.exceptions
 
+import app.common.password_hasher as password_hasher
 import app.common.utils as utils
 from app.api.account.response_case import AccountResponseCase
 from app.api.response_case import CommonResponseCase
@@ -54,10 +55,25 @@ def register_request_handler(app: flask.Flask):
     def handle_405(exception: werkzeug.exceptions.HTTPException):
         return CommonResponseCase.http_mtd_forbidden.create_response()
 
+    @app.errorhandler(413)
+    def handle_413(exception: werkzeug.exceptions.HTTPException):
+        return CommonResponseCase.body_too_large.create_response()
+
+    @app.errorhandler(416)
+    def handle_416(exception: werkzeug.exceptions.RequestedRangeNotSatisfiable):
+        header: tuple[tuple[str, str], ...] = ()
+        if getattr(exception, "length", None) is not None:
+            header = (("Content-Range", f"{exception.units} */{exception.length}"),)
+        return CommonResponseCase.range_not_satisfiable.create_response(header=header)
+
     @app.errorhandler(429)
     def handle_429(exception: werkzeug.exceptions.HTTPException):
         return CommonResponseCase.rate_limit.create_response()
 
+    @app.errorhandler(password_hasher.PasswordHasherBusyError)
+    def handle_password_hasher_busy(exception: password_hasher.PasswordHasherBusyError):
+        return CommonResponseCase.server_busy.create_response()
+
     @app.errorhandler(Exception)
     def handle_exception(exception: werkzeug.exceptions.HTTPException):
         # response = exception.get_response()  # TODO: Log this
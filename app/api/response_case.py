@@ -44,6 +44,18 @@ class CommonResponseCase(api_class.ResponseCaseCollector):
         success=False,
         public_sub_code="request.body.empty",
     )
+    body_too_large = api_class.Response(
+        description="This will be responsed when user-sent body data is larger than the server accepts.",
+        code=413,
+        success=False,
+        public_sub_code="request.body.too_large",
+    )
+    range_not_satisfiable = api_class.Response(
+        description="This will be responsed when user-sent Range header is out of the resource or not parsable.",
+        code=416,
+        success=False,
+        public_sub_code="request.header.range_not_satisfiable",
+    )
     body_required_omitted = api_class.Response(
         description="This will be responsed when some requirements are not given in user-sent body data.",
         code=400,
@@ -123,6 +135,13 @@ class CommonResponseCase(api_class.ResponseCaseCollector):
         success=False,
         public_sub_code="request.rate_limit",
     )
+    server_busy = api_class.Response(
+        description="Server is too busy to handle this request now. Please retry after a while.",
+        code=503,
+        success=False,
+        public_sub_code="backend.busy",
+        header=(("Retry-After", "1"),),
+    )
 
 
 class ResourceResponseCase(api_class.ResponseCaseCollector):
@@ -192,6 +211,14 @@ class ResourceResponseCase(api_class.ResponseCaseCollector):
         header=(("ETag", ""),),
         data={},
     )
+    resource_redirect = api_class.Response(  # Read, but from other URL
+        description="Resource must be requested again from URL on Location header",
+        code=303,
+        success=True,
+        public_sub_code="resource.redirect",
+        header=(("Location", ""),),
+        data={},
+    )
     multiple_resources_found = api_class.Response(  # Read
         description="Multiple resources found",
         code=200,
@@ -1,16 +1,37 @@
 import flask
 
+import app.common.cli_tools.auth_benchmark as auth_benchmark
+import app.common.cli_tools.datetime_parser_benchmark as datetime_parser_benchmark
 import app.common.cli_tools.db_erd_draw as db_erd_draw
 import app.common.cli_tools.db_operation as db_operation
+import app.common.cli_tools.file_store as file_store
+import app.common.cli_tools.json_benchmark as json_benchmark
 import app.common.cli_tools.openapi_support as openapi_support
+import app.common.cli_tools.password_hash_benchmark as password_hash_benchmark
+import app.common.cli_tools.password_hash_calibration as password_hash_calibration
+import app.common.cli_tools.request_validation_benchmark as request_validation_benchmark
 import app.common.cli_tools.shell_plus as shell_plus
+import app.common.cli_tools.signin_benchmark as signin_benchmark
+import app.common.cli_tools.ua_benchmark as ua_benchmark
 
 
 def init_app(app: flask.Flask):
     app.cli.add_command(openapi_support.create_openapi_doc)
     app.cli.add_command(db_operation.drop_db)
+    app.cli.add_command(db_operation.explain_user_lookup)
+    app.cli.add_command(db_operation.token_revoke_reindex)
+    app.cli.add_command(file_store.file_store_migrate)
+    app.cli.add_command(file_store.file_store_gc)
     app.cli.add_command(db_erd_draw.draw_db_erd)
     app.cli.add_command(shell_plus.shell_plus)
+    app.cli.add_command(json_benchmark.benchmark_json)
+    app.cli.add_command(auth_benchmark.benchmark_auth_check)
+    app.cli.add_command(ua_benchmark.benchmark_ua_fingerprint)
+    app.cli.add_command(password_hash_benchmark.benchmark_password_hash)
+    app.cli.add_command(password_hash_calibration.calibrate_password_hash)
+    app.cli.add_command(signin_benchmark.benchmark_signin_queries)
+    app.cli.add_command(request_validation_benchmark.benchmark_request_validation)
+    app.cli.add_command(datetime_parser_benchmark.benchmark_datetime_parser)
 
     # init_app must return app
     return app
@@ -0,0 +1,81 @@
+import datetime
+import time
+import timeit
+
+import click
+import flask
+import flask.cli
+import redis
+
+
+class SlowRedis(redis.StrictRedis):
+    """Redis client that waits before every command, to simulate a slow or distant Redis server."""
+
+    delay: float = 0.0
+
+    def execute_command(self, *args, **options):
+        time.sleep(self.delay)
+        return super().execute_command(*args, **options)
+
+
+@click.command("benchmark-auth-check")
+@click.option("--redis-delay", default=2.0, help="Delay in milliseconds added to every Redis command")
+@click.option("--number", default=1000, help="Repeat count of each case")
+@click.option("--ready-timeout", default=10.0, help="Seconds to wait for the revocation set to be bootstrapped")
+@flask.cli.with_appcontext
+def benchmark_auth_check(redis_delay: float, number: int, ready_timeout: float):
+    current_app = flask.current_app
+
+    import app.database.redis_connection as redis_connection
+
+    slow_redis = SlowRedis(connection_pool=redis_connection.connection_pool)
+
+    import app.database.jwt as jwt_module
+    import app.database.token_revocation as token_revocation
+
+    # Point the revocation subsystem to the slow Redis, only for this process.
+    token_revocation.redis_db = slow_redis
+    revocation_set = token_revocation.revocation_set
+    revocation_set.enabled = True
+
+    key = current_app.config.get("SECRET_KEY") + "benchmark-csrf-token"
+    access_token = jwt_module.AccessToken()
+    access_token.exp = datetime.datetime.utcnow().replace(microsecond=0) + jwt_module.access_token_valid_duration
+    access_token.user = 1
+    access_token.jti = 2**62  # JTI that is never issued, so the check always takes the negative path.
+    access_token_jwt = jwt_module.TokenBase.create_token(access_token, key)
+
+    def auth_check():
+        jwt_module.AccessToken.from_token(access_token_jwt, key)
+
+    cache_max_size = jwt_module.access_token_cache.max_size
+    results: dict[str, float] = {}
+    try:
+        jwt_module.access_token_cache.max_size = 0
+
+        slow_redis.delay = 0.0
+        revocation_set.start()
+        ready_deadline = time.monotonic() + ready_timeout
+        while not revocation_set.ready:
+            if time.monotonic() > ready_deadline:
+                raise click.ClickException(
+                    f"Token revocation set was not ready in {ready_timeout} seconds. "
+                    "Check that Redis is reachable, and see the log of token-revocation-listener for the reason."
+                )
+            time.sleep(0.1)
+        slow_redis.delay = redis_delay / 1000
+
+        revocation_set.ready = False
+        results["Redis GET on every check"] = timeit.timeit(auth_check, number=number)
+        revocation_set.ready = True
+        results["local revocation set"] = timeit.timeit(auth_check, number=number)
+
+        jwt_module.access_token_cache.max_size = cache_max_size or 1
+        results["local revocation set + token cache"] = timeit.timeit(auth_check, number=number)
+    finally:
+        jwt_module.access_token_cache.max_size = cache_max_size
+        jwt_module.access_token_cache.clear()
+
+    print(f"Auth check latency with {redis_delay}ms Redis delay, {number} times each")
+    for case_name, result in results.items():
+        print(f"{case_name:<40}{result / number * 1000:>10.4f} ms")
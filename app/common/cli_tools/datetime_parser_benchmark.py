@@ -0,0 +1,93 @@
+import datetime
+import timeit
+import typing
+
+import click
+import flask.cli
+
+import app.common.utils.datetime_parser as datetime_parser
+
+# Date strings that clients and other services send
+PARSABLE_CORPUS = (
+    "2022-11-15",
+    "2022-11-15T09:30:00",
+    "2022-11-15T09:30:00Z",
+    "2022-11-15T09:30:00.123456Z",
+    "2022-11-15T09:30:00+09:00",
+    "2022-11-15T09:30:00.123+09:00",
+    "2022-11-15 09:30:00",
+    "2022-11-15 09:30:00.123456",
+    "2022-11-15 09:30:00+0900",
+    "2022-11-15 09:30:00 +0900",
+    "2022.11.15",
+    "2022.11.15 09:30:00",
+    "2022/11/15",
+    "2022/11/15 09:30:00",
+    "2022. 11. 15.",
+    "20221115",
+    "20221115 09:30:00",
+    "20221115093000",
+    "15-11-2022",
+    "15.11.2022",
+    "15/11/2022",
+    "15/11/2022 09:30:00",
+    "11/15/2022",
+    "15-Nov-2022",
+    "15-Nov-2022 09:30:00",
+    "15 Nov 2022",
+    "2022-Nov-15",
+    "November 15 2022",
+    "Tue 15 Nov 2022",
+    "Tuesday 15 November 2022",
+    "Tue Nov 15 2022",
+    "Tue Nov 15 09:30:00 UTC 2022",
+    "before Nov-2022",
+    "before 20221115",
+)
+UNPARSABLE_CORPUS = (
+    "user_id",
+    "Passw0rd!!",
+    "user@example.com",
+    "2022-13-45",
+    "2022-W46-2",
+    "15/11/22 09:30",
+    "yesterday",
+)
+
+
+def parse_datetime_legacy(value: str) -> typing.Optional[datetime.datetime]:
+    # Loop that dict_type_check ran before datetime_parser was introduced
+    for format in datetime_parser.POSSIBLE_DATETIME_FORMAT:
+        try:
+            return datetime.datetime.strptime(value, format)
+        except ValueError:
+            continue
+    return None
+
+
+@click.command("benchmark-datetime-parser")
+@click.option("--number", default=20, help="Repeat count of the corpus")
+@flask.cli.with_appcontext
+def benchmark_datetime_parser(number: int):
+    for value in PARSABLE_CORPUS + UNPARSABLE_CORPUS:
+        if parse_datetime_legacy(value) != datetime_parser.parse_datetime(value):
+            print(f"Result mismatch on {value}")
+
+    print(f"Datetime parsing, {number} times of each corpus")
+    for corpus_name, corpus in (("parsable", PARSABLE_CORPUS), ("unparsable", UNPARSABLE_CORPUS)):
+
+        def run_legacy():
+            for value in corpus:
+                parse_datetime_legacy(value)
+
+        def run_parser():
+            for value in corpus:
+                datetime_parser.parse_datetime(value)
+
+        parse_count = number * len(corpus)
+        legacy_time = timeit.timeit(run_legacy, number=number)
+        parser_time = timeit.timeit(run_parser, number=number)
+
+        print(f"{corpus_name}, {len(corpus)} strings")
+        print(f"{'  strptime on every format':<40}{legacy_time / parse_count * 1e6:>10.2f} us")
+        print(f"{'  fingerprinted candidates':<40}{parser_time / parse_count * 1e6:>10.2f} us")
@@ -1,8 +1,10 @@
 import click
 import flask
 import flask.cli
+import sqlalchemy as sql
 
 import app.database
+import app.database.user as user_module
 
 
 @click.command("drop-db")
@@ -17,3 +19,54 @@ def drop_db():
         print("Successfully dropped DB")
     except Exception:
         print("Error raised while dropping DB")
+
+
+@click.command("explain-user-lookup")
+@flask.cli.with_appcontext
+def explain_user_lookup():
+    """Checks that case-insensitive user lookups use lower(...) indexes of TB_USER, exits with 1 if not."""
+    db = app.database.db
+    dialect_name = db.engine.dialect.name
+    if dialect_name == "sqlite":
+        explain_prefix = "EXPLAIN QUERY PLAN "
+    elif dialect_name == "postgresql":
+        explain_prefix = "EXPLAIN "
+    else:
+        print(f"EXPLAIN check for {dialect_name} is not implemented yet!")
+        raise SystemExit(1)
+
+    User = user_module.User
+    lookups = {
+        "UX_User_lower_id": sql.func.lower(User.id) == "user_id",
+        "UX_User_lower_nickname": sql.func.lower(User.nickname) == "nickname",
+        "UX_User_lower_email": sql.func.lower(User.email) == sql.func.lower("user@example.com"),
+    }
+
+    all_index_used = True
+    with db.engine.connect() as conn, conn.begin():
+        if dialect_name == "postgresql":
+            # Planner prefers seq scan on small tables, so this only checks that the index can be used.
+            conn.execute(sql.text("SET LOCAL enable_seqscan = off"))
+
+        for index_name, condition in lookups.items():
+            statement = sql.select(User.uuid).where(condition)
+            compiled = statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+            plan = "\n".join(" ".join(map(str, row)) for row in conn.execute(sql.text(explain_prefix + str(compiled))))
+
+            index_used = index_name in plan
+            all_index_used &= index_used
+            print(f"{index_name}: {'used' if index_used else 'NOT USED'}")
+            print("    " + plan.replace("\n", "\n    "))
+
+    if not all_index_used:
+        raise SystemExit(1)
+
+
+@click.command("token-revoke-reindex")
+@flask.cli.with_appcontext
+def token_revoke_reindex():
+    """Copies revocations made before the revocation index was introduced to the index, and prunes expired ones."""
+    import app.database.token_revocation as token_revocation
+
+    print(f"Indexed {token_revocation.build_revocation_index()} revoked tokens")
+    print(f"Pruned {token_revocation.prune_revocation_index()} expired revocations")
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import shutil
+import time
+
+import click
+import flask
+import flask.cli
+import sqlalchemy as sql
+
+import app.database
+
+
+@click.command("file-store-migrate")
+@click.option("--batch-size", default=100, show_default=True, help="Number of files loaded on one query.")
+@flask.cli.with_appcontext
+def file_store_migrate(batch_size: int):
+    """Moves files uploaded before the content-addressed store into the store, deduplicating identical ones."""
+    import app.database.uploaded_file as filedb_module
+
+    db = app.database.db
+    UploadedFile = filedb_module.UploadedFile
+
+    migrated_count, missing_count, last_uuid = 0, 0, 0
+    while target_files := (
+        db.session.query(UploadedFile)
+        .filter(UploadedFile.content_hash.is_(None))
+        .filter(UploadedFile.deleted_at.is_(None))
+        .filter(UploadedFile.uuid > last_uuid)
+        .order_by(UploadedFile.uuid)
+        .limit(batch_size)
+        .all()
+    ):
+        for target_file in target_files:
+            last_uuid = target_file.uuid
+            legacy_path = target_file.get_path()
+            if not legacy_path.exists():
+                missing_count += 1
+                continue
+
+            with legacy_path.open("rb") as fp:
+                content_hash = hashlib.file_digest(fp, "sha256").hexdigest()
+
+            filedb_module.FileBlob.add_reference(content_hash, legacy_path.stat().st_size)
+            target_file.content_hash = content_hash
+
+            # Legacy file is kept until commit, so a failure here leaves the file readable on its old path.
+            blob_path = filedb_module.get_blob_path(content_hash)
+            if not blob_path.exists():
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = blob_path.with_name(f".{blob_path.name}.migrate")
+                try:
+                    os.link(legacy_path, temp_path)
+                except OSError:
+                    shutil.copyfile(legacy_path, temp_path)
+                os.replace(temp_path, blob_path)
+
+            db.session.commit()
+            legacy_path.unlink(missing_ok=True)
+            migrated_count += 1
+
+    print(f"Migrated {migrated_count} files, {missing_count} files were missing on disk")
+
+
+@click.command("file-store-gc")
+@click.option(
+    "--orphan-age",
+    default=3600,
+    show_default=True,
+    help="Seconds after which blob and temp files without DB row are removed.",
+)
+@flask.cli.with_appcontext
+def file_store_gc(orphan_age: int):
+    """Removes blobs that no file refers, and files left by uploads that failed before commit."""
+    import app.database.uploaded_file as filedb_module
+
+    db = app.database.db
+    FileBlob = filedb_module.FileBlob
+    print(f"Collected {FileBlob.collect_garbage()} unreferenced blobs")
+
+    # Files newer than orphan_age may belong to uploads that are not committed yet.
+    orphan_time = time.time() - orphan_age
+    old_temp_paths = [
+        z for z in (filedb_module.USER_CONTENT_UPLOAD_DIR / ".tmp").glob(".upload-*") if z.stat().st_mtime < orphan_time
+    ]
+    for temp_path in old_temp_paths:
+        temp_path.unlink(missing_ok=True)
+
+    orphan_count = 0
+    old_blob_paths = [z for z in filedb_module.USER_CONTENT_BLOB_DIR.glob("*/*/*") if z.stat().st_mtime < orphan_time]
+    for i in range(0, len(old_blob_paths), 500):
+        blob_paths = {z.name: z for z in old_blob_paths[i : i + 500]}
+        stored_hashes = set(
+            db.session.execute(sql.select(FileBlob.content_hash).where(FileBlob.content_hash.in_(blob_paths)))
+            .scalars()
+            .all()
+        )
+        for content_hash, blob_path in blob_paths.items():
+            if content_hash not in stored_hashes:
+                blob_path.unlink(missing_ok=True)
+                orphan_count += 1
+
+    print(f"Removed {orphan_count} orphan blob files and {len(old_temp_paths)} stale upload temp files")
@@ -0,0 +1,89 @@
+import datetime
+import timeit
+
+import click
+import flask
+import flask.cli
+
+import app.common.utils.json_provider as json_provider
+import app.database.board as board_module
+import app.database.uploaded_file as uploaded_file_module
+import app.database.user as user_module
+
+BENCHMARK_LIST_SIZES = (1, 10, 100, 1000, 10000)
+
+
+def create_payloads(size: int) -> dict[str, list[dict]]:
+    # Models are not added to the session, so this does not touch the DB.
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    users = [
+        user_module.User(
+            uuid=i,
+            id=f"user{i}",
+            nickname=f"닉네임{i}",
+            email=f"user{i}@example.com",
+            email_verified=bool(i % 2),
+            description="Lorem ipsum dolor sit amet, " * 4,
+            profile_image=f"/uploads/{i:032x}.png",
+            created_at=now,
+            modified_at=now - datetime.timedelta(minutes=i),
+        )
+        for i in range(size)
+    ]
+    posts = [
+        board_module.Post(
+            uuid=i,
+            user=user,
+            user_id=user.uuid,
+            title=f"Post title {i}",
+            body="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 16,
+            announcement=False,
+            private=False,
+            created_at=now,
+            modified_at=now - datetime.timedelta(minutes=i),
+        )
+        for i, user in enumerate(users)
+    ]
+    files = [
+        uploaded_file_module.UploadedFile(
+            uuid=i,
+            uploaded_by=user,
+            private=False,
+            mimetype="image/png",
+            size=1024 * i,
+            filename=f"{i:032x}.png",
+            original_filename=f"image_{i}.png",
+            additional_data='{"width": 1920, "height": 1080}',
+            alternative_data=None,
+            created_at=now,
+            modified_at=now,
+        )
+        for i, user in enumerate(users)
+    ]
+
+    return {
+        "User": [z.to_dict() for z in users],
+        "Post": [z.to_dict(has_perm=True) for z in posts],
+        "UploadedFile": [z.to_dict() for z in files],
+    }
+
+
+@click.command("benchmark-json")
+@click.option("--number", default=0, help="Repeat count of each case, calculated from the list size if not given")
+@flask.cli.with_appcontext
+def benchmark_json(number: int):
+    providers: dict[str, json_provider.StdlibJSONProvider] = {}
+    for provider_name, provider_class in json_provider.JSON_PROVIDERS.items():
+        try:
+            providers[provider_name] = provider_class(flask.current_app._get_current_object())
+        except RuntimeError as err:
+            print(f"Skipping {provider_name}: {err}")
+
+    print(f"{'model':<14}{'size':>7}" + "".join(f"{z + ' (ms)':>16}" for z in providers))
+    for size in BENCHMARK_LIST_SIZES:
+        for model_name, payload in create_payloads(size).items():
+            repeat = number or max(1, 10000 // size)
+            results: list[float] = []
+            for provider in providers.values():
+                results.append(timeit.timeit(lambda: provider.dumpb({"data": payload}), number=repeat) / repeat * 1000)
+            print(f"{model_name:<14}{size:>7}" + "".join(f"{z:>16.4f}" for z in results))
@@ -0,0 +1,67 @@
+import json
+import pathlib
+import statistics
+import time
+
+import click
+import flask
+import flask.cli
+from passlib.hash import argon2
+
+
+def measure_hash_time(samples: int, time_cost: int, memory_cost: int, parallelism: int) -> float:
+    hasher = argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        hasher.hash("calibration-Passw0rd!")
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+@click.command("calibrate-password-hash")
+@click.option("--target-ms", default=250.0, help="Hash time budget of a login, in milliseconds")
+@click.option("--max-memory-cost", default=65536, help="Upper limit of memory per hash, in KiB")
+@click.option("--parallelism", default=0, help="Argon2 lanes, 0 means the current value")
+@click.option("--samples", default=5, help="Number of hashes measured on each step")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="JSON file to write parameters")
+@flask.cli.with_appcontext
+def calibrate_password_hash(target_ms: float, max_memory_cost: int, parallelism: int, samples: int, output: str | None):
+    """
+    Finds the strongest argon2 parameters that hash within target time on this host.
+    Memory cost is kept as high as possible first, then time cost is raised while it fits in the budget.
+    Run this on the production hardware, without other load.
+    """
+    target = target_ms / 1000
+    parallelism = parallelism or flask.current_app.config.get("PASSWORD_HASH_PARALLELISM") or argon2.parallelism
+
+    # Memory cost must be at least 8KiB per lane
+    time_cost, memory_cost = 1, max_memory_cost
+    duration = measure_hash_time(samples, time_cost, memory_cost, parallelism)
+    while duration > target and memory_cost // 2 >= 8 * parallelism:
+        memory_cost //= 2
+        duration = measure_hash_time(samples, time_cost, memory_cost, parallelism)
+    print(f"t={time_cost}, m={memory_cost}KiB, p={parallelism}: {duration * 1000:.1f}ms")
+
+    while duration <= target:
+        next_duration = measure_hash_time(samples, time_cost + 1, memory_cost, parallelism)
+        print(f"t={time_cost + 1}, m={memory_cost}KiB, p={parallelism}: {next_duration * 1000:.1f}ms")
+        if next_duration > target:
+            break
+        time_cost, duration = time_cost + 1, next_duration
+
+    if duration > target:
+        print(f"Even the lowest parameters take {duration * 1000:.1f}ms, over the target of {target_ms}ms.")
+
+    params = {
+        "PASSWORD_HASH_TIME_COST": time_cost,
+        "PASSWORD_HASH_MEMORY_COST": memory_cost,
+        "PASSWORD_HASH_PARALLELISM": parallelism,
+    }
+    print(f"Selected parameters take {duration * 1000:.1f}ms per hash")
+    for key, value in params.items():
+        print(f"{key}={value} (current: {flask.current_app.config.get(key) or 'default'})")
+
+    if output:
+        pathlib.Path(output).write_text(json.dumps(params, indent=4) + "\n", encoding="utf-8")
+        print(f"Parameters are written to {output}, copy them to the env file of this host.")
@@ -0,0 +1,118 @@
+import contextlib
+import copy
+import datetime
+import json
+import timeit
+import typing
+
+import click
+import flask.cli
+
+import app.api.helper_class as api_class
+
+# Fields of sign-in and sign-up routes
+REQUEST_FIELDS: dict[str, tuple[dict[str, dict[str, str]], dict[str, dict[str, str]]]] = {
+    "sign-in": ({"id": {"type": "string"}, "pw": {"type": "string"}}, {}),
+    "sign-up": (
+        {"id": {"type": "string"}, "pw": {"type": "string"}, "nick": {"type": "string"}, "email": {"type": "string"}},
+        {"description": {"type": "string"}, "private": {"type": "boolean"}, "age": {"type": "integer"}},
+    ),
+}
+REQUEST_BODIES: dict[str, dict[str, typing.Any]] = {
+    "sign-in": {"id": "user_id", "pw": "Passw0rd!!"},
+    "sign-up": {
+        "id": "user_id",
+        "pw": "Passw0rd!!",
+        "nick": " 닉네임 ",
+        "email": "user@example.com",
+        "private": True,
+        "age": "20",
+        "client_version": "1.0.0",  # Field that the route doesn't declare
+        "": "empty key",
+    },
+}
+
+
+def legacy_dict_type_check(
+    type_def: dict[str, dict[str, str]], data: dict[str, typing.Any]
+) -> typing.Optional[tuple[str, str, str]]:
+    # Type check that RequestBody did on every request before FieldValidatorPlan was introduced
+    type_def_rtypes = {k: api_class.openapi_type_def_inverse[v["type"]] for k, v in type_def.items()}
+    data_for_iter = copy.deepcopy(data)
+
+    for data_k, data_v in data_for_iter.items():
+        expected_type = type_def_rtypes.get(data_k, None)
+        if not expected_type:
+            return (data_k, "UNKNOWN", "UNKNOWN")
+
+        if expected_type is str:
+            if not isinstance(data_v, str):
+                data[data_k] = str(data_v)
+        elif not isinstance(data_v, expected_type):
+            if isinstance(data_v, str):
+                with contextlib.suppress(Exception):
+                    data_v_parsed = json.loads(data_v)
+                    if issubclass(expected_type, (int, float)) and isinstance(data_v_parsed, (int, float)):
+                        data[data_k] = expected_type(data_v_parsed)
+                        continue
+                    elif isinstance(data_v_parsed, str):
+                        result: str | datetime.datetime = data_v_parsed
+                        for format in api_class.POSSIBLE_DATETIME_FORMAT:
+                            try:
+                                result = datetime.datetime.strptime(data_v_parsed, format)
+                                break
+                            except ValueError:
+                                continue
+                        data[data_k] = result
+                    elif isinstance(data_v_parsed, expected_type):
+                        data[data_k] = expected_type(data_v_parsed)
+                        continue
+
+            expected_type_openapi_str = api_class.openapi_type_def[expected_type]
+            type_we_got = api_class.openapi_type_def.get(type(data_v), "UNKNOWN")
+            return (data_k, expected_type_openapi_str, type_we_got)
+
+    return None
+
+
+def validate_legacy(
+    required_fields: dict[str, dict[str, str]], optional_fields: dict[str, dict[str, str]], body: dict
+) -> typing.Any:
+    fields = copy.deepcopy(required_fields)
+    fields.update(optional_fields)
+
+    req_body = api_class.json_dict_filter(body, True)
+    if not all([z in req_body.keys() for z in required_fields]):
+        return [z for z in required_fields if z not in req_body]
+    req_body = {k: req_body[k] for k in req_body if k in list(required_fields.keys()) + list(optional_fields.keys())}
+    return legacy_dict_type_check(fields, req_body) or req_body
+
+
+def validate_with_plan(plan: api_class.FieldValidatorPlan, body: dict) -> typing.Any:
+    req_body = plan.collect(body)
+    if lacks := plan.lacks(req_body):
+        return lacks
+    return plan.type_check(req_body) or req_body
+
+
+@click.command("benchmark-request-validation")
+@click.option("--number", default=100000, help="Repeat count of each case")
+@flask.cli.with_appcontext
+def benchmark_request_validation(number: int):
+    print(f"Request body validation, {number} times each")
+    for request_name, (required_fields, optional_fields) in REQUEST_FIELDS.items():
+        body = REQUEST_BODIES[request_name]
+        plan = api_class.FieldValidatorPlan(required_fields, optional_fields)
+        if validate_legacy(required_fields, optional_fields, body) != validate_with_plan(plan, body):
+            print(f"Result mismatch on {request_name}")
+
+        compile_time = timeit.timeit(
+            lambda: api_class.FieldValidatorPlan(required_fields, optional_fields), number=number // 10
+        )
+        legacy_time = timeit.timeit(lambda: validate_legacy(required_fields, optional_fields, body), number=number)
+        plan_time = timeit.timeit(lambda: validate_with_plan(plan, body), number=number)
+
+        print(f"{request_name}")
+        print(f"{'  compile plan (once per view)':<40}{compile_time / (number // 10) * 1e6:>10.2f} us")
+        print(f"{'  filter + deepcopy type check':<40}{legacy_time / number * 1e6:>10.2f} us")
+        print(f"{'  compiled plan':<40}{plan_time / number * 1e6:>10.2f} us")
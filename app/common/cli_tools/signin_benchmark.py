@@ -0,0 +1,122 @@
+import contextlib
+import secrets
+import time
+
+import click
+import flask
+import flask.cli
+import sqlalchemy as sql
+
+import app.common.password_hasher as password_hasher
+import app.database as db_module
+import app.database.jwt as jwt_module
+import app.database.user as user_module
+
+db = db_module.db
+
+
+class StatementCounter:
+    """Counts SQL statements and transaction ends sent to DB, each of them is a round trip."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.commits: int = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.split(None, 1)[0].upper())
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+    @contextlib.contextmanager
+    def count(self, engine: sql.engine.Engine):
+        sql.event.listen(engine, "before_cursor_execute", self.on_execute)
+        sql.event.listen(engine, "commit", self.on_commit)
+        try:
+            yield self
+        finally:
+            sql.event.remove(engine, "before_cursor_execute", self.on_execute)
+            sql.event.remove(engine, "commit", self.on_commit)
+
+
+def sign_in(user_id: str, password: str, single_transaction: bool) -> None:
+    """
+    Signs in the same way as the sign-in route.
+    Without single_transaction, login record and refresh token are committed separately, as it was before.
+    """
+    current_app = flask.current_app
+    account, reason = user_module.User.try_login(user_id, password, db_commit=not single_transaction)
+    if account is False:
+        raise RuntimeError(f"Sign-in failed: {reason}")
+    jwt_module.create_login_data(
+        account,
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/107.0.0.0 Safari/537.36",
+        "benchmark-csrf-token",
+        None,
+        "127.0.0.1",
+        current_app.config.get("SECRET_KEY"),
+        db_commit=not single_transaction,
+    )
+    account.to_dict()
+    if single_transaction:
+        db.session.commit()
+
+
+@click.command("benchmark-signin-queries")
+@click.option("--number", default=10, help="Number of sign-ins on each path")
+@flask.cli.with_appcontext
+def benchmark_signin_queries(number: int):
+    """
+    Signs in to a temporary account on the old path(separate commits) and the current path(one transaction),
+    and compares SQL statements and round trips per sign-in. The account and its tokens are deleted afterwards.
+    """
+    current_app = flask.current_app
+    user_id = f"benchmark{secrets.token_hex(4)}"
+    password = "benchmark-Passw0rd!"
+
+    new_user = user_module.User()
+    new_user.id = user_id
+    new_user.email = f"{user_id}@example.com"
+    new_user.nickname = user_id
+    new_user.email_verified = True
+    new_user.password = password_hasher.password_hasher.hash(password)
+    new_user.pw_changed_at = sql.func.now()
+    new_user.last_login_date = sql.func.now()
+    db.session.add(new_user)
+    db.session.commit()
+    user_uuid = new_user.uuid
+
+    paths = {"separate commits": False, "one transaction": True}
+    counters: dict[str, StatementCounter] = {}
+    elapsed: dict[str, float] = {}
+    try:
+        for path_name, single_transaction in paths.items():
+            counter = counters[path_name] = StatementCounter()
+            elapsed[path_name] = 0.0
+            for _ in range(number):
+                # Every sign-in starts with a fresh session, like a new request
+                db.session.remove()
+                with current_app.test_request_context(), counter.count(db.engine):
+                    started_at = time.perf_counter()
+                    sign_in(user_id, password, single_transaction)
+                    elapsed[path_name] += time.perf_counter() - started_at
+    finally:
+        db.session.remove()
+        db.session.query(jwt_module.RefreshToken).filter(jwt_module.RefreshToken.user == user_uuid).delete()
+        db.session.query(user_module.User).filter(user_module.User.uuid == user_uuid).delete()
+        db.session.commit()
+
+    statement_types = sorted({statement for counter in counters.values() for statement in counter.statements})
+
+    def print_row(row_name: str, values: list[str]) -> None:
+        print(f"{row_name:<30}" + "".join(f"{value:>20}" for value in values))
+
+    print(f"Sign-in on {db.engine.dialect.name}, {number} times on each path, per sign-in")
+    print_row("", list(paths))
+    print_row("statements", [f"{len(z.statements) / number:.1f}" for z in counters.values()])
+    for statement in statement_types:
+        print_row("  " + statement, [f"{z.statements.count(statement) / number:.1f}" for z in counters.values()])
+    print_row("commits", [f"{z.commits / number:.1f}" for z in counters.values()])
+    print_row("round trips", [f"{(len(z.statements) + z.commits) / number:.1f}" for z in counters.values()])
+    print_row("latency(ms)", [f"{z / number * 1000:.2f}" for z in elapsed.values()])
+    print("Latency includes password hash.")
@@ -0,0 +1,75 @@
+import timeit
+
+import click
+import flask.cli
+import user_agents
+
+import app.common.utils.user_agent as ua_fingerprint
+
+# User-Agents of common browsers, bots and in-app webviews
+USER_AGENT_CORPUS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36 Edg/107.0.1418.42",  # noqa: E501
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:107.0) Gecko/20100101 Firefox/107.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15",  # noqa: E501
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",  # noqa: E501
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:107.0) Gecko/20100101 Firefox/107.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_1_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Mobile/15E148 Safari/604.1",  # noqa: E501
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/107.0.5304.101 Mobile/15E148 Safari/604.1",  # noqa: E501
+    "Mozilla/5.0 (iPad; CPU OS 16_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Mobile/15E148 Safari/604.1",  # noqa: E501
+    "Mozilla/5.0 (Linux; Android 13; SM-S908N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Mobile Safari/537.36",  # noqa: E501
+    "Mozilla/5.0 (Linux; Android 12; SM-G991N) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/19.0 Chrome/102.0.5005.125 Mobile Safari/537.36",  # noqa: E501
+    "Mozilla/5.0 (Linux; Android 13; Pixel 7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Mobile Safari/537.36",  # noqa: E501
+    "Mozilla/5.0 (Linux; Android 12; SM-X700) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 11; SM-A525F) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/106.0.5249.126 Mobile Safari/537.36 KAKAOTALK 9.9.7",  # noqa: E501
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 NAVER(inapp; search; 1000; 11.23.6)",  # noqa: E501
+    "Mozilla/5.0 (Linux; Android 13; SM-S901N Build/TP1A.220624.014; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/107.0.5304.105 Mobile Safari/537.36",  # noqa: E501
+    "okhttp/4.10.0",
+    "Dalvik/2.1.0 (Linux; U; Android 13; SM-S908N Build/TP1A.220624.014)",
+    "FROST/1.0.0 (iPhone; iOS 16.1.1; Scale/3.00)",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "curl/7.86.0",
+)
+
+
+def compare_by_parsing(db_user_agent: str, req_user_agent: str) -> bool:
+    # Device check that refresh_login_data did before fingerprint was introduced
+    db_ua = user_agents.parse(db_user_agent)
+    req_ua = user_agents.parse(req_user_agent)
+    return all(
+        (
+            db_ua.is_mobile == req_ua.is_mobile,
+            db_ua.is_tablet == req_ua.is_tablet,
+            db_ua.is_pc == req_ua.is_pc,
+            db_ua.os.family == req_ua.os.family,
+            db_ua.browser.family == req_ua.browser.family,
+        )
+    )
+
+
+def compare_by_fingerprint(db_ua_fingerprint: str, req_user_agent: str) -> bool:
+    return db_ua_fingerprint == ua_fingerprint.get_fingerprint(req_user_agent)
+
+
+@click.command("benchmark-ua-fingerprint")
+@click.option("--number", default=20, help="Repeat count of the corpus")
+@flask.cli.with_appcontext
+def benchmark_ua_fingerprint(number: int):
+    fingerprints = {z: ua_fingerprint.get_fingerprint(z) for z in USER_AGENT_CORPUS}
+    for user_agent, fingerprint in fingerprints.items():
+        if compare_by_parsing(user_agent, user_agent) != compare_by_fingerprint(fingerprint, user_agent):
+            print(f"Result mismatch on {user_agent}")
+
+    def run_parsing():
+        for user_agent in USER_AGENT_CORPUS:
+            compare_by_parsing(user_agent, user_agent)
+
+    def run_fingerprint():
+        for user_agent, fingerprint in fingerprints.items():
+            compare_by_fingerprint(fingerprint, user_agent)
+
+    check_count = number * len(USER_AGENT_CORPUS)
+    print(f"User-Agent device check on {len(USER_AGENT_CORPUS)} User-Agents, {check_count} checks each")
+    print(f"{'parse both User-Agents':<40}{timeit.timeit(run_parsing, number=number) / check_count * 1e6:>10.2f} us")
+    print(f"{'cached fingerprint':<40}{timeit.timeit(run_fingerprint, number=number) / check_count * 1e6:>10.2f} us")
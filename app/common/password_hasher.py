@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+import typing
+
+import flask
+from passlib.hash import argon2
+
+import app.common.utils.metrics as metrics
+
+T = typing.TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs argon2 on native threads, so that hashing doesn't block other requests on the eventlet worker.
+    At most max_workers hashes run at once, and up to max_queue requests wait for their turn.
+    Requests over that, or requests that waited more than queue_timeout seconds,
+    fail with PasswordHasherBusyError instead of piling up.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        queue_timeout: float,
+        time_cost: int = 0,
+        memory_cost: int = 0,
+        parallelism: int = 0,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        # Parameters that are 0 are left as passlib's default
+        hash_params = {"rounds": time_cost, "memory_cost": memory_cost, "parallelism": parallelism}
+        self.argon2 = argon2.using(**{k: v for k, v in hash_params.items() if v})
+
+        self.lock = threading.Lock()
+        self.worker_slot = threading.BoundedSemaphore(max_workers)
+        self.pending: int = 0
+        self.rejected: int = 0
+
+        self.queue_wait_stat = metrics.DurationStat()
+        self.hash_stat = metrics.DurationStat()
+
+    @staticmethod
+    def run_on_native_thread(func: typing.Callable[..., T], *args) -> T:
+        # Green threads of eventlet share one OS thread, so CPU bound work must go to eventlet's native thread pool.
+        # Size of that pool can be set with $env:EVENTLET_THREADPOOL_SIZE, which must be >= PASSWORD_HASH_MAX_WORKERS.
+        import eventlet.patcher
+
+        if eventlet.patcher.is_monkey_patched("thread"):
+            import eventlet.tpool
+
+            return eventlet.tpool.execute(func, *args)
+        # Without eventlet, request is already on its own native thread.
+        return func(*args)
+
+    def run(self, func: typing.Callable[..., T], *args) -> T:
+        with self.lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusyError("Password hash queue is full")
+            self.pending += 1
+
+        try:
+            queued_at = time.perf_counter()
+            if not self.worker_slot.acquire(timeout=self.queue_timeout):
+                with self.lock:
+                    self.rejected += 1
+                raise PasswordHasherBusyError("Timed out while waiting for password hash worker")
+
+            try:
+                started_at = time.perf_counter()
+                self.queue_wait_stat.observe(started_at - queued_at)
+                return self.run_on_native_thread(func, *args)
+            finally:
+                self.hash_stat.observe(time.perf_counter() - started_at)
+                self.worker_slot.release()
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def hash(self, password: str) -> str:
+        return self.run(self.argon2.hash, password)
+
+    def verify(self, password_hash: str, *passwords: str) -> bool:
+        """Returns True if any of the passwords matches. All candidates are verified on one worker turn."""
+
+        def verify_any() -> bool:
+            return any(self.argon2.verify(password, password_hash) for password in passwords)
+
+        return self.run(verify_any)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Returns True if the hash was made with other algorithm or parameters than the current ones."""
+        return self.argon2.needs_update(password_hash)
+
+    def get_metrics(self) -> dict[str, typing.Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "params": {
+                "time_cost": self.argon2.default_rounds,
+                "memory_cost": self.argon2.memory_cost,
+                "parallelism": self.argon2.parallelism,
+            },
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait_stat.to_dict(),
+            "hash": self.hash_stat.to_dict(),
+        }
+
+
+password_hasher: PasswordHasher = None
+
+
+def init_app(app: flask.Flask):
+    global password_hasher
+
+    password_hasher = PasswordHasher(
+        max_workers=app.config.get("PASSWORD_HASH_MAX_WORKERS") or os.cpu_count() or 1,
+        max_queue=app.config.get("PASSWORD_HASH_MAX_QUEUE", 64),
+        queue_timeout=app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5),
+        time_cost=app.config.get("PASSWORD_HASH_TIME_COST", 0),
+        memory_cost=app.config.get("PASSWORD_HASH_MEMORY_COST", 0),
+        parallelism=app.config.get("PASSWORD_HASH_PARALLELISM", 0),
+    )
+    metrics.register_collector("password_hash", password_hasher.get_metrics)
+
+    # init_app must return app
+    return app
@@ -328,9 +328,33 @@ safe_int = ignore_exception(Exception, 0)(int)
 safe_json_loads = ignore_exception(Exception, None)(json.loads)
 
 
+# Names are hardcoded as strftime's %a and %b depend on the locale.
+HTTP_DATE_WEEKDAY_NAME = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+HTTP_DATE_MONTH_NAME = ("", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def http_date(value: datetime.date) -> str:
+    # Same as value.strftime("%a, %d %b %Y %H:%M:%S GMT"), but aware datetime is converted to UTC first.
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(UTC)
+        hour, minute, second = value.hour, value.minute, value.second
+    else:
+        hour = minute = second = 0
+    return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+        HTTP_DATE_WEEKDAY_NAME[value.weekday()],
+        value.day,
+        HTTP_DATE_MONTH_NAME[value.month],
+        value.year,
+        hour,
+        minute,
+        second,
+    )
+
+
 def json_default(value):
     if isinstance(value, datetime.date):
-        return value.strftime("%a, %d %b %Y %H:%M:%S GMT")
+        return http_date(value)
     raise TypeError("not JSON serializable")
 
 
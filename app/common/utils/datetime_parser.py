@@ -0,0 +1,187 @@
+import datetime
+import functools
+import itertools
+import re
+import string
+import typing
+
+POSSIBLE_DATETIME_FORMAT = [
+    "%d-%b-%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d/%m/%Y",
+    "%Y-%m-%d",
+    "%Y.%m.%d",
+    "%Y/%m/%d",
+    "before %b-%Y",
+    "before %Y%m%d",
+    "%Y.%m.%d %H:%M:%S",
+    "%Y%m%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S %z",
+    "%Y-%m-%d %H:%M:%S CLST",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%d.%m.%Y  %H:%M:%S",
+    "%d-%b-%Y %H:%M:%S %Z",
+    "%Y/%m/%d %H:%M:%S (%z)",
+    "%Y/%m/%d %H:%M:%S",
+    "%a %b %d %H:%M:%S %Z %Y",
+    "%a %b %d %Y",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dt%H:%M:%S.%fz",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dt%H:%M:%S.%f",
+    "%Y-%m-%dt%H:%M:%S",
+    "%Y-%m-%dt%H:%M:%SZ",
+    "%Y-%m-%dt%H:%M:%S.%fz",
+    "%Y-%m-%dt%H:%M:%S%z",
+    "%Y-%m-%dt%H:%M:%S.%f%z",
+    "%Y%m%d",
+    "%Y. %m. %d.",
+    "before %b-%Y",
+    "%a %d %b %Y",
+    "%A %d %b %Y",
+    "%a %d %B %Y",
+    "%A %d %B %Y",
+    "%Y-%m-%d %H:%M:%S (%Z+0:00)",
+    "%d-%m-%Y %H:%M:%S %Z+1",
+    "%B %d %Y",
+    "%Y-%b-%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y",
+    "%d %b %Y",
+    "%d-%b-%Y %H:%M:%S",
+    "%Y%m%d%H%M%S",
+    "%Y-%m-%d %H:%M:%S (%Z%z)",
+    "%d %B %Y at %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S.%f %Z",
+]
+
+# ---------- Shape fingerprint ----------
+# Fingerprint of a string is its shape, digit runs become `9`, letter runs become `a`,
+# whitespace runs become a single space, and every other character is kept as-is.
+# e.g. "2022-01-05T10:20:30Z" -> "9-9-9a9:9:9a", "05 Jan 2022" -> "9 a 9"
+_FINGERPRINT_TRANS_TABLE = str.maketrans(
+    {
+        **{c: "9" for c in string.digits},
+        **{c: "a" for c in string.ascii_letters},
+        **{c: " " for c in string.whitespace},
+    }
+)
+_FINGERPRINT_RUN_COLLAPSE = re.compile(r"([9a ])\1+")
+
+
+def fingerprint(value: str) -> str:
+    return _FINGERPRINT_RUN_COLLAPSE.sub(r"\1", value.translate(_FINGERPRINT_TRANS_TABLE))
+
+
+# Sample values of strptime directives that are used on POSSIBLE_DATETIME_FORMAT.
+# Some directives can take more than one shape, so every shape that strptime accepts must be listed here,
+# or the classifier might skip the format that could parse the string.
+_DIRECTIVE_SAMPLES: dict[str, tuple[str, ...]] = {
+    "Y": ("2000",),
+    "m": ("01",),
+    "d": ("01",),
+    "H": ("00",),
+    "M": ("00",),
+    "S": ("00",),
+    "f": ("0",),
+    "a": ("Mon",),
+    "A": ("Monday",),
+    "b": ("Jan",),
+    "B": ("January",),
+    "Z": ("UTC",),
+    "z": tuple(
+        itertools.chain.from_iterable(
+            (
+                f"{sign}0900",
+                f"{sign}09:00",
+                f"{sign}09:00:00",
+                f"{sign}090000.0",
+                f"{sign}09:00.0",
+                f"{sign}09:00:00.0",
+            )
+            for sign in "+-"
+        )
+    )
+    + ("Z",),
+}
+_DIRECTIVE = re.compile(r"%(.)")
+
+
+def _format_fingerprints(format: str) -> set[str]:
+    literal_parts: list[str] = _DIRECTIVE.split(format)[::2]
+    directives: list[str] = _DIRECTIVE.findall(format)
+
+    result: set[str] = set()
+    for directive_samples in itertools.product(*(_DIRECTIVE_SAMPLES[z] for z in directives)):
+        sample = literal_parts[0]
+        for directive_sample, literal_part in zip(directive_samples, literal_parts[1:]):
+            sample += directive_sample + literal_part
+        result.add(fingerprint(sample))
+    return result
+
+
+def _dedupe_formats(formats: typing.Iterable[str]) -> tuple[str, ...]:
+    # strptime matches literals case-insensitively, so formats that differ only in case of literals are duplicates.
+    # Directives are case-sensitive, so keep them as-is. (_DIRECTIVE.split returns literals on even indices)
+    result: dict[str, str] = {}
+    for format in formats:
+        format_key = "".join(z.lower() if not i % 2 else "%" + z for i, z in enumerate(_DIRECTIVE.split(format)))
+        result.setdefault(format_key, format)
+    return tuple(result.values())
+
+
+_FORMAT_FINGERPRINTS: tuple[tuple[str, set[str]], ...] = tuple(
+    (z, _format_fingerprints(z)) for z in _dedupe_formats(POSSIBLE_DATETIME_FORMAT)
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def candidate_formats(value_fingerprint: str) -> tuple[str, ...]:
+    """
+    Returns formats that can parse the strings with this fingerprint,
+    in the same order of POSSIBLE_DATETIME_FORMAT, so that the first matching format always wins.
+    """
+    return tuple(z for z, z_fingerprints in _FORMAT_FINGERPRINTS if value_fingerprint in z_fingerprints)
+
+
+# ---------- Parser ----------
+# ISO 8601 shapes that datetime.fromisoformat parses to the same result with the first matching format
+# of POSSIBLE_DATETIME_FORMAT. fromisoformat accepts more than these (week dates, any separator, 7+ fraction digits),
+# and space-separated `Z` is parsed as UTC by %z, so anything else goes through the formats.
+_ISO_FAST_PATH = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}"
+    r"(?:[Tt][0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{1,6})?(?:[Zz]|[+-][0-9]{2}:?[0-9]{2})?"
+    r"| [0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{1,6}|[+-][0-9]{2}:?[0-9]{2})?)?"
+)
+
+
+def parse_datetime(value: str) -> typing.Optional[datetime.datetime]:
+    """
+    Parse string as datetime, returns None if it's not parsable.
+    ISO 8601 strings are parsed with datetime.fromisoformat, and the others are tried only with
+    the formats that have the same shape with the string.
+    """
+    if not value:
+        return None
+
+    # Fast path for ISO 8601 extended format (YYYY-MM-DD...)
+    if value[4:5] == "-" and value[7:8] == "-" and _ISO_FAST_PATH.fullmatch(value):
+        try:
+            result = datetime.datetime.fromisoformat(value)
+            # Literal `Z` on POSSIBLE_DATETIME_FORMAT gives a naive datetime, keep that behaviour.
+            return result.replace(tzinfo=None) if value[-1] in "Zz" else result
+        except ValueError:
+            pass
+
+    for format in candidate_formats(fingerprint(value)):
+        try:
+            return datetime.datetime.strptime(value, format)
+        except ValueError:
+            continue
+
+    return None
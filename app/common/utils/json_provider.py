@@ -0,0 +1,112 @@
+import datetime
+import json
+import typing
+
+import flask
+import flask.json.provider
+
+import app.common.utils as utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_default(value: typing.Any) -> typing.Any:
+    # Same as utils.json_default, and flask handles the others like uuid, decimal, dataclass and Markup.
+    if isinstance(value, datetime.date):
+        return utils.http_date(value)
+    return flask.json.provider._default(value)
+
+
+class StdlibJSONProvider(flask.json.provider.DefaultJSONProvider):
+    """
+    JSON provider that uses Python's built-in json module, this is used when no other encoder is available.
+    Output is same with flask's DefaultJSONProvider.
+    """
+
+    default = staticmethod(json_default)
+
+    def __init__(self, app: flask.Flask):
+        super().__init__(app)
+        # JSON_AS_ASCII and JSON_SORT_KEYS config is deprecated on flask, read it once here.
+        if app.config.get("JSON_AS_ASCII", None) is not None:
+            self.ensure_ascii = app.config["JSON_AS_ASCII"]
+        if app.config.get("JSON_SORT_KEYS", None) is not None:
+            self.sort_keys = app.config["JSON_SORT_KEYS"]
+
+    def is_pretty(self) -> bool:
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def dumps(self, obj: typing.Any, **kwargs) -> str:
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumpb(self, obj: typing.Any, pretty: bool = False) -> bytes:
+        """Serialize data as UTF-8 encoded JSON bytes, without trailing newline."""
+        return self.dumps(obj, **({"indent": 2} if pretty else {"separators": (",", ":")})).encode()
+
+    def loads(self, s: str | bytes, **kwargs) -> typing.Any:
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs) -> flask.Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj, self.is_pretty()) + b"\n", mimetype=self.mimetype)
+
+
+class OrjsonJSONProvider(StdlibJSONProvider):
+    """
+    JSON provider that uses orjson, which encodes directly to bytes.
+    orjson formats datetime as RFC 3339, so datetime is passed through to default to keep HTTP date format.
+    Anything orjson cannot handle (ensure_ascii, integers over 64 bits, ...) is encoded with the stdlib instead.
+    """
+
+    def __init__(self, app: flask.Flask):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+        super().__init__(app)
+        self.option: int = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            self.option |= orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj: typing.Any, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumpb(obj).decode()
+
+    def dumpb(self, obj: typing.Any, pretty: bool = False) -> bytes:
+        if not self.ensure_ascii:
+            try:
+                option = self.option | orjson.OPT_INDENT_2 if pretty else self.option
+                return orjson.dumps(obj, default=self.default, option=option)
+            except orjson.JSONEncodeError:
+                pass
+        return super().dumpb(obj, pretty)
+
+    def loads(self, s: str | bytes, **kwargs) -> typing.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+JSON_PROVIDERS: dict[str, typing.Type[StdlibJSONProvider]] = {
+    "stdlib": StdlibJSONProvider,
+    "orjson": OrjsonJSONProvider,
+}
+
+
+def create_json_provider(app: flask.Flask) -> StdlibJSONProvider:
+    provider_name: str = app.config.get("JSON_PROVIDER", "auto")
+    if provider_name == "auto":
+        provider_name = "orjson" if orjson is not None else "stdlib"
+
+    if provider_name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON_PROVIDER {provider_name}, expected one of {', '.join(JSON_PROVIDERS)}")
+    if provider_name == "orjson" and orjson is None:
+        app.logger.warning("JSON_PROVIDER is set to orjson, but orjson is not installed. Fallback to stdlib.")
+        provider_name = "stdlib"
+
+    return JSON_PROVIDERS[provider_name](app)
@@ -0,0 +1,36 @@
+import threading
+import typing
+
+# Name -> function that returns current metrics of a subsystem as a JSON serializable dict
+metric_collectors: dict[str, typing.Callable[[], dict[str, typing.Any]]] = {}
+
+
+def register_collector(name: str, collector: typing.Callable[[], dict[str, typing.Any]]) -> None:
+    metric_collectors[name] = collector
+
+
+def collect() -> dict[str, dict[str, typing.Any]]:
+    return {name: collector() for name, collector in metric_collectors.items()}
+
+
+class DurationStat:
+    """Count, total and max of durations in seconds, reported in milliseconds."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, duration: float) -> None:
+        with self.lock:
+            self.count += 1
+            self.total += duration
+            self.max = max(self.max, duration)
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
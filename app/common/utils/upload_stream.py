@@ -0,0 +1,61 @@
+import hashlib
+import os
+import pathlib as pt
+import tempfile
+import weakref
+
+import werkzeug.exceptions
+
+
+class UploadStream:
+    """
+    Writable file that werkzeug streams an uploaded file into, chunk by chunk.
+    While the data goes to a temp file, this hashes it, counts its size and keeps its first bytes for MIME sniffing,
+    so that the file never needs to be read again after upload.
+    """
+
+    def __init__(self, directory: pt.Path, max_size: int = 0, head_size: int = 16384, hash_name: str = "sha256"):
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        self.path = pt.Path(path)
+        self.file = os.fdopen(fd, "w+b")
+        # Temp file is removed when this is closed or garbage collected, unless it's saved before that.
+        self.remove_temp_file = weakref.finalize(self, self.path.unlink, True)
+
+        self.max_size = max_size
+        self.head_size = head_size
+        self.hash = hashlib.new(hash_name)
+        self.size: int = 0
+        self.head = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_size and self.size > self.max_size:
+            self.close()
+            raise werkzeug.exceptions.RequestEntityTooLarge()
+
+        if len(self.head) < self.head_size:
+            self.head += data[: self.head_size - len(self.head)]
+        self.hash.update(data)
+        return self.file.write(data)
+
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+    def save(self, destination: pt.Path) -> None:
+        """Moves the uploaded file to destination at once, so that no one sees a partially written file there."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path, destination)
+        self.remove_temp_file.detach()
+
+    def close(self) -> None:
+        self.file.close()
+        self.remove_temp_file()
+
+    def __getattr__(self, name: str):
+        # werkzeug needs seek(), read() and so on, which are just the ones of the temp file.
+        return getattr(self.file, name)
@@ -0,0 +1,31 @@
+import functools
+import typing
+
+import user_agents
+
+# Parsed results of recent User-Agent strings are kept, clients send the same User-Agent on every request.
+USER_AGENT_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def get_fingerprint(user_agent: str) -> str:
+    """
+    Returns device type, OS family and browser family of User-Agent as a compact string,
+    formatted as "<is_mobile><is_tablet><is_pc>|<OS family>|<browser family>", e.g. "001|Windows|Chrome".
+    Two User-Agents are treated as the same device when their fingerprints are same.
+    """
+    parsed_ua = user_agents.parse(user_agent)
+    return "|".join(
+        (
+            f"{parsed_ua.is_mobile:d}{parsed_ua.is_tablet:d}{parsed_ua.is_pc:d}",
+            parsed_ua.os.family,
+            parsed_ua.browser.family,
+        )
+    )
+
+
+def get_fingerprint_or_none(user_agent: str) -> typing.Optional[str]:
+    try:
+        return get_fingerprint(user_agent)
+    except Exception:
+        return None
@@ -14,6 +14,8 @@ class Config:
     X_PREFIX_LEVEL = int(os.environ.get("X_PREFIX_LEVEL", 0))
 
     JSON_AS_ASCII = False
+    # One of "auto", "orjson" and "stdlib". "auto" uses orjson if it's installed.
+    JSON_PROVIDER = os.environ.get("JSON_PROVIDER", "auto")
     PROJECT_NAME = os.environ.get("PROJECT_NAME")
     BACKEND_NAME = os.environ.get("BACKEND_NAME")
     SERVER_NAME = os.environ.get("SERVER_NAME", None)
@@ -33,6 +35,19 @@ class Config:
     DROP_ALL_REFRESH_TOKEN_ON_LOAD = os.environ.get("DROP_ALL_REFRESH_TOKEN_ON_LOAD", True) != "false"
 
     FILE_MANAGEMENT_ROUTE_ENABLE = os.environ.get("FILE_MANAGEMENT_ROUTE_ENABLE", False) == "true"
+    # Uploaded files larger than this(bytes) are rejected with 413 while they're being received. 0 disables limit.
+    FILE_UPLOAD_MAX_SIZE = int(os.environ.get("FILE_UPLOAD_MAX_SIZE", 100 * 1024 * 1024))
+    # Let the web server send uploaded files after the app authorized the request, instead of the app worker.
+    # One of ""(app sends files), "x-accel-redirect"(nginx) and "x-sendfile"(Apache mod_xsendfile, lighttpd).
+    FILE_SERVE_OFFLOAD = os.environ.get("FILE_SERVE_OFFLOAD", "").lower()
+    # Internal nginx location aliasing user_content directory, see docker/nginx/templates/frost.conf.template
+    FILE_SERVE_OFFLOAD_PREFIX = os.environ.get("FILE_SERVE_OFFLOAD_PREFIX", "/_protected_user_content/")
+    # Files larger than this(bytes) are not sent as base64 in JSON, and the request is redirected to binary response.
+    # 0 disables limit.
+    FILE_JSON_MODE_MAX_SIZE = int(os.environ.get("FILE_JSON_MODE_MAX_SIZE", 16 * 1024 * 1024))
+    # Seconds that browsers and shared caches may reuse a public file without asking again.
+    # Private files are always revalidated, and are never stored on shared caches.
+    FILE_CACHE_PUBLIC_MAX_AGE = int(os.environ.get("FILE_CACHE_PUBLIC_MAX_AGE", 3600))
     FILE_UPLOAD_IMAGE_WEB_FRIENDLY_CHECK = os.environ.get("FILE_UPLOAD_IMAGE_WEB_FRIENDLY_CHECK", False) == "true"
     try:
         FILE_UPLOAD_ALLOW_EXTENSION = json.loads(os.environ.get("FILE_UPLOAD_ALLOW_EXTENSION", "[]"))
@@ -43,11 +58,81 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
     SQLALCHEMY_DATABASE_URI = os.environ.get("DB_URL")
+    # Each process holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW DB connections(-1 for unlimited overflow).
+    # Requests over that wait DB_POOL_TIMEOUT seconds for a connection, and fail after that.
+    # Size this with WORKER_CONNECTIONS, and keep (pool size + overflow) * processes under DB's max_connections.
+    # Pool options are ignored on SQLite.
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+    # Connections older than DB_POOL_RECYCLE seconds are reopened, before DB or proxies close idle ones.
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    # This will be disabled only if $env:DB_POOL_PRE_PING is 'false'
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", True) != "false"
+    # PostgreSQL only, milliseconds. Statements of server processes running longer than this are cancelled.
+    # CLI commands like migrations are not limited. 0 disables timeout.
+    DB_STATEMENT_TIMEOUT = int(os.environ.get("DB_STATEMENT_TIMEOUT", 0))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    # Read replicas as a JSON array of DB URLs, using the same pool options as primary.
+    # GET requests and read_replica() blocks read from one replica per request, until the request writes anything.
+    # Replicas failed to connect are skipped for DB_REPLICA_RETRY_INTERVAL seconds, and reads fall back to primary.
+    try:
+        DB_REPLICA_URLS = json.loads(os.environ.get("DB_REPLICA_URLS", "[]"))
+    except Exception:
+        print("Failed to load DB_REPLICA_URLS.\n" "Please check the value is a valid JSON array.")
+        DB_REPLICA_URLS = []
+    DB_REPLICA_RETRY_INTERVAL = float(os.environ.get("DB_REPLICA_RETRY_INTERVAL", 30))
+    # Greenlets per process, same value with `gunicorn --worker-connections`(default: 1000).
+    # Startup warns when this is larger than DB pool capacity on eventlet worker.
+    WORKER_CONNECTIONS = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+
+    # Argon2 runs on native threads, PASSWORD_HASH_MAX_WORKERS at once(default: CPU count).
+    # Requests over PASSWORD_HASH_MAX_QUEUE waiting, or waiting more than PASSWORD_HASH_QUEUE_TIMEOUT seconds,
+    # get 503 response. Set $env:EVENTLET_THREADPOOL_SIZE to PASSWORD_HASH_MAX_WORKERS or more on eventlet worker.
+    PASSWORD_HASH_MAX_WORKERS = int(os.environ.get("PASSWORD_HASH_MAX_WORKERS", 0))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+    # Argon2 parameters, 0 means passlib's default. Use `flask calibrate-password-hash` to find them for this host.
+    # Hashes made with other parameters are rehashed when the user signs in.
+    PASSWORD_HASH_TIME_COST = int(os.environ.get("PASSWORD_HASH_TIME_COST", 0))
+    PASSWORD_HASH_MEMORY_COST = int(os.environ.get("PASSWORD_HASH_MEMORY_COST", 0))  # KiB
+    PASSWORD_HASH_PARALLELISM = int(os.environ.get("PASSWORD_HASH_PARALLELISM", 0))
+
+    # Duplicate check caches "not used" answers of ID, nickname and email on Redis
+    # for DUPLICATE_CHECK_CACHE_TTL seconds. Set this to 0 to disable cache.
+    DUPLICATE_CHECK_CACHE_TTL = int(os.environ.get("DUPLICATE_CHECK_CACHE_TTL", 10))
+
+    # Verified access tokens are cached on each process, set ACCESS_TOKEN_CACHE_SIZE to 0 to disable cache.
+    # Revoked access token can be accepted by other processes until ACCESS_TOKEN_CACHE_REVOKE_CHECK_INTERVAL(seconds).
+    ACCESS_TOKEN_CACHE_SIZE = int(os.environ.get("ACCESS_TOKEN_CACHE_SIZE", 8192))
+    ACCESS_TOKEN_CACHE_REVOKE_CHECK_INTERVAL = float(os.environ.get("ACCESS_TOKEN_CACHE_REVOKE_CHECK_INTERVAL", 5))
+    # Each process keeps revoked token list in memory, and keeps it current with Redis pub/sub.
+    # This will be disabled only if $env:TOKEN_REVOKE_FEED_ENABLE is 'false'
+    TOKEN_REVOKE_FEED_ENABLE = os.environ.get("TOKEN_REVOKE_FEED_ENABLE", True) != "false"
 
     REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD")
     REDIS_HOST = os.environ.get("REDIS_HOST")
     REDIS_PORT = int(os.environ.get("REDIS_PORT"))
     REDIS_DB = int(os.environ.get("REDIS_DB"))
+    # Overrides REDIS_HOST/PORT/DB/PASSWORD when set. redis://, rediss://, unix:// and
+    # redis+sentinel://[:password@]host:port[,host:port...]/service_name[/db] are supported.
+    REDIS_URL = os.environ.get("REDIS_URL", None)
+    # Every Redis user of a process shares one connection pool of REDIS_MAX_CONNECTIONS connections,
+    # and waits up to REDIS_POOL_TIMEOUT seconds for a free connection when all of them are in use.
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", 64))
+    REDIS_POOL_TIMEOUT = float(os.environ.get("REDIS_POOL_TIMEOUT", 5))
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 5))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", 2))
+    # Idle connections are checked with PING before use after REDIS_HEALTH_CHECK_INTERVAL seconds.
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30))
+    # Commands failed by connection error or timeout are retried with exponential backoff.
+    REDIS_RETRY_COUNT = int(os.environ.get("REDIS_RETRY_COUNT", 3))
 
     # This will enable only if $env:MAIL_ENABLE is 'false'
     MAIL_ENABLE = os.environ.get("MAIL_ENABLE", True) != "false"
@@ -1,7 +1,10 @@
+import contextlib
 import enum
+import random
 import re
 import secrets
 import sys
+import time
 import typing
 
 import flask
@@ -10,9 +13,17 @@ import redis  # We'll manage redis here too.
 import sqlalchemy.dialects.mysql as sqldlc_mysql
 import sqlalchemy.dialects.postgresql as sqldlc_psql
 import sqlalchemy.dialects.sqlite as sqldlc_sqlite
+import sqlalchemy.event as sql_event
+import sqlalchemy.exc as sql_exc
 import sqlalchemy.inspection as sql_inspect
+import sqlalchemy.orm as sql_orm
+import sqlalchemy.sql.dml as sql_dml
+import sqlalchemy.sql.selectable as sql_selectable
+import sqlalchemy.sql.visitors as sql_visitors
 
 import app.common.utils as utils
+import app.common.utils.metrics as metrics
+import app.database.db_pool as db_pool
 
 # ---------- ENV DETECTION --------
 # Detect if this context is app or server
@@ -30,14 +41,123 @@ class RedisKeyType(utils.EnumAutoName):
     EMAIL_VERIFICATION = enum.auto()
     EMAIL_PASSWORD_RESET = enum.auto()
     TOKEN_REVOKE = enum.auto()
+    ACCOUNT_AVAILABLE = enum.auto()
 
     def as_redis_key(self, value: str):
         return f"{self.value}={value}"
 
 
 # ---------- RDB Setup ----------
+# Read replicas are registered as binds named REPLICA_BIND_PREFIX + index
+REPLICA_BIND_PREFIX = "replica_"
+REPLICA_READABLE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Bind key -> time.monotonic() until which the replica is skipped, after it failed to connect
+replica_down_until: dict[str, float] = {}
+
+
+def get_replica_bind_keys() -> list[str]:
+    return [f"{REPLICA_BIND_PREFIX}{i}" for i in range(len(flask.current_app.config.get("DB_REPLICA_URLS") or []))]
+
+
+def mark_primary_sticky() -> None:
+    # Once the request writes anything, rest of the request reads from primary to see its own writes.
+    if flask.has_request_context():
+        flask.g.db_primary_sticky = True
+
+
+@contextlib.contextmanager
+def route_reads(target: str):
+    if not flask.has_request_context():
+        yield
+        return
+
+    previous_target = flask.g.get("db_route", None)
+    flask.g.db_route = target
+    try:
+        yield
+    finally:
+        flask.g.db_route = previous_target
+
+
+def read_replica():
+    """Reads in this block may go to a read replica even on non-GET requests. Use this only where stale data is fine."""
+    return route_reads("replica")
+
+
+def use_primary():
+    """Reads in this block always go to primary."""
+    return route_reads("primary")
+
+
+class RoutingSession(fsql.SignallingSession):
+    """
+    Sends SELECTs of GET requests and read_replica() blocks to one read replica per request.
+    Everything else, and every read after the request wrote anything, goes to primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.is_replica_readable(mapper, clause) and (replica_engine := self.get_replica_connection()):
+            return replica_engine
+        return super().get_bind(mapper, clause)
+
+    def is_replica_readable(self, mapper, clause) -> bool:
+        if not flask.has_request_context() or self._flushing:
+            return False
+        if isinstance(clause, sql_dml.UpdateBase):
+            mark_primary_sticky()
+            return False
+        if flask.g.get("db_primary_sticky", False) or not isinstance(clause, sql_selectable.SelectBase):
+            return False
+        if getattr(clause, "_for_update_arg", None) is not None:
+            return False
+        if mapper is not None and mapper.persist_selectable.info.get("bind_key") is not None:
+            return False
+
+        if (route := flask.g.get("db_route", None)) is not None:
+            return route == "replica"
+        return flask.request.method in REPLICA_READABLE_METHODS
+
+    def get_replica_connection(self):
+        if (bind_key := flask.g.get("db_replica_bind_key", None)) is None:
+            current_time = time.monotonic()
+            candidates = [z for z in get_replica_bind_keys() if replica_down_until.get(z, 0) <= current_time]
+            bind_key = flask.g.db_replica_bind_key = random.choice(candidates) if candidates else ""
+        if not bind_key:
+            return None
+
+        replica_engine = db.get_engine(self.app, bind=bind_key)
+        try:
+            # Join the replica to this transaction now, so that a replica that is down falls back to primary
+            # instead of failing the query. This is a dict lookup after the first query of the request.
+            self.connection(bind_arguments={"bind": replica_engine})
+        except sql_exc.DBAPIError:
+            replica_down_until[bind_key] = time.monotonic() + flask.current_app.config.get(
+                "DB_REPLICA_RETRY_INTERVAL", 30
+            )
+            flask.g.db_replica_bind_key = ""
+            return None
+        return replica_engine
+
+
+@sql_event.listens_for(RoutingSession, "after_flush")
+def on_after_flush(session, flush_context):
+    mark_primary_sticky()
+
+
+class SQLAlchemy(fsql.SQLAlchemy):
+    def create_engine(self, sa_url, engine_opts):
+        # Engine options of config are applied here, after all driver defaults of flask_sqlalchemy.
+        engine_opts = db_pool.get_engine_options(
+            sa_url.drivername, engine_opts, flask.current_app.config.get("DB_STATEMENT_TIMEOUT", 0), IS_ENV_RUNSERVER
+        )
+        return super().create_engine(sa_url, engine_opts)
+
+    def create_session(self, options):
+        return sql_orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
 # Create db object when module loads, but do not connect to app context yet.
-db: fsql.SQLAlchemy = fsql.SQLAlchemy(session_options={"autoflush": False})
+db: fsql.SQLAlchemy = SQLAlchemy(session_options={"autoflush": False})
 BaseModel: typing.TypeAlias = db.Model  # type: ignore[name-defined]
 
 # ---------- RDB Type Handler ----------
@@ -55,8 +175,24 @@ IntegrityCase = [
 ]
 
 
+def get_index_column_name(index_name: str) -> typing.Optional[str]:
+    # Violation of functional unique index(ex: lower(id)) is reported with index name instead of column name,
+    # so find the column from the index definition.
+    for table in db.metadata.tables.values():
+        for index in table.indexes:
+            if index.name != index_name:
+                continue
+            for expression in index.expressions:
+                for element in sql_visitors.iterate(expression):
+                    if isinstance(element, db.Column):
+                        return element.name
+    return None
+
+
 def IntegrityCaser_sqlite(err_str):
     def default_column_extractor(errstr):
+        if index_name := re.findall(r"index '(\S+)'", errstr):
+            return get_index_column_name(index_name[0])
         return errstr.split(":")[1].split(",")[0].split(".")[1].strip()
 
     case_data = {
@@ -78,6 +214,8 @@ def IntegrityCaser_sqlite(err_str):
 
 def IntegrityCaser_psycopg2(err, pgcode):
     def unique_column_extractor(err):
+        if index_column_name := get_index_column_name(err.__cause__.diag.constraint_name):
+            return index_column_name
         return re.findall(r"Key \((\S+)\)=\((\S+)\) already exists.", err.__cause__.diag.message_detail)[0][0]
 
     def null_column_extractor(err):
@@ -142,21 +280,40 @@ class DefaultModelMixin:
 
 
 def init_app(app: flask.Flask):
+    # Read replicas are used only by RoutingSession, no table is bound to them.
+    replica_binds = {
+        f"{REPLICA_BIND_PREFIX}{i}": replica_url
+        for i, replica_url in enumerate(app.config.get("DB_REPLICA_URLS") or [])
+    }
+    app.config["SQLALCHEMY_BINDS"] = {**(app.config.get("SQLALCHEMY_BINDS") or {}), **replica_binds}
+
     # Connect to app context
     db.init_app(app)
+    metrics.register_collector("db_pool", lambda: db_pool.get_pool_metrics(db.engine.pool))
+    for bind_key in replica_binds:
+        metrics.register_collector(
+            f"db_pool.{bind_key}",
+            lambda bind_key=bind_key: {
+                **db_pool.get_pool_metrics(db.get_engine(bind=bind_key).pool),
+                "down": replica_down_until.get(bind_key, 0) > time.monotonic(),
+            },
+        )
+
+    # Redis connection pool is shared by redis_db and rate limiter
+    import app.database.redis_connection as redis_connection
+
+    redis_connection.init_app(app)
+
+    # This is created on every context including CLI commands, and no connection is made until the first command.
+    # Modules bind redis_db on import, so this must be set before any of them is imported.
+    global redis_db
+
+    redis_db = redis.StrictRedis(connection_pool=redis_connection.connection_pool)
 
     if IS_ENV_RUNSERVER:
         # Dummy query for checking connection to DB
         db.session.execute("select 1")
-
-        global redis_db
-
-        redis_db = redis.StrictRedis(
-            password=app.config.get("REDIS_PASSWORD"),
-            host=app.config.get("REDIS_HOST"),
-            port=app.config.get("REDIS_PORT"),
-            db=app.config.get("REDIS_DB"),
-        )
+        db_pool.check_pool_capacity(app.config, db.engine.pool)
 
         import app.database.board as board  # noqa: F401
         import app.database.jwt as jwt_module
@@ -0,0 +1,98 @@
+import logging
+import time
+import typing
+
+import sqlalchemy.exc as sql_exc
+import sqlalchemy.pool as sql_pool
+
+import app.common.utils.metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(sql_pool.QueuePool):
+    """QueuePool that measures how long each checkout waited, so that an undersized pool shows up on metrics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Time taken to get a connection from the pool, including time to open a new one.
+        self.checkout_wait_stat = metrics.DurationStat()
+        self.checkout_timeout_count: int = 0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sql_exc.TimeoutError:
+            self.checkout_timeout_count += 1
+            raise
+        finally:
+            self.checkout_wait_stat.observe(time.perf_counter() - started_at)
+
+
+def get_engine_options(
+    drivername: str, options: dict[str, typing.Any], statement_timeout: int, is_server: bool
+) -> dict[str, typing.Any]:
+    if drivername.startswith("sqlite"):
+        # SQLite runs on StaticPool or NullPool, which don't take size options
+        for option_name in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(option_name, None)
+        return options
+
+    options.setdefault("poolclass", InstrumentedQueuePool)
+
+    # Statement timeout is applied only on server processes,
+    # so that migrations and CLI tools can run long statements.
+    if statement_timeout and is_server and drivername.startswith("postgresql"):
+        connect_args = options.setdefault("connect_args", {})
+        connect_args["options"] = f'{connect_args.get("options", "")} -c statement_timeout={statement_timeout}'.strip()
+
+    return options
+
+
+def get_pool_metrics(pool: sql_pool.Pool) -> dict[str, typing.Any]:
+    pool_metrics: dict[str, typing.Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, sql_pool.QueuePool):
+        pool_metrics.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        pool_metrics.update(
+            {
+                "checkout_wait": pool.checkout_wait_stat.to_dict(),
+                "checkout_timeout": pool.checkout_timeout_count,
+            }
+        )
+    return pool_metrics
+
+
+def get_worker_concurrency(config: typing.Mapping[str, typing.Any]) -> int:
+    """Number of requests a process can run at once, or 0 if unknown."""
+    import eventlet.patcher
+
+    if eventlet.patcher.is_monkey_patched("socket"):
+        return int(config.get("WORKER_CONNECTIONS", 1000))
+    return 0
+
+
+def check_pool_capacity(config: typing.Mapping[str, typing.Any], pool: sql_pool.Pool) -> None:
+    if not isinstance(pool, sql_pool.QueuePool) or not (concurrency := get_worker_concurrency(config)):
+        return
+
+    if pool._max_overflow < 0:  # Unlimited overflow
+        return
+
+    pool_capacity = pool.size() + pool._max_overflow
+    if concurrency > pool_capacity:
+        logger.warning(
+            f"Up to {concurrency} greenlets can run on this process, but DB pool holds only {pool_capacity} "
+            f"connections(DB_POOL_SIZE + DB_MAX_OVERFLOW). Requests over that wait up to {pool.timeout()} seconds "
+            "for a connection, and fail after that. Raise the pool size or lower WORKER_CONNECTIONS."
+        )
@@ -1,17 +1,26 @@
+import calendar
+import collections
+import copy
 import datetime
-import inspect
+import functools
+import json
+import operator
 import secrets
+import threading
+import time
 import typing
 
 import flask
 import jwt
 import jwt.exceptions
+import jwt.utils
 import redis
-import user_agents as ua
-import user_agents.parsers as ua_parser
+import sqlalchemy as sql
 
 import app.common.utils as utils
+import app.common.utils.user_agent as ua_fingerprint
 import app.database as db_module
+import app.database.token_revocation as token_revocation
 import app.database.user as user_module
 
 db = db_module.db
@@ -27,9 +36,97 @@ admin_token_valid_duration: datetime.timedelta = datetime.timedelta(hours=12)
 
 T = typing.TypeVar("T", bound="TokenBase")
 
+jws = jwt.PyJWS()
+
+
+@functools.lru_cache
+def jwt_header_segment(algorithm: str) -> bytes:
+    # Same header that jwt.encode creates when no additional header is given
+    header = json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":"), sort_keys=True).encode()
+    return jwt.utils.base64url_encode(header)
+
+
+def is_jti_revoked(jti: int) -> bool:
+    return token_revocation.revocation_set.is_revoked(jti)
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified tokens, keyed by the raw JWT string, key and algorithm.
+    Entries are dropped when the token expires, and token revocation must be re-checked
+    when revoke_check_interval seconds have passed since the last check,
+    so a revoked token is rejected on every process within that interval.
+    """
+
+    def __init__(self, max_size: int, revoke_check_interval: float):
+        self.max_size = max_size
+        self.revoke_check_interval = revoke_check_interval
+
+        self.lock = threading.Lock()
+        # cache key -> [token, token expiration unix time, last revocation check time]
+        self.entries: collections.OrderedDict[tuple[str, str, str], list] = collections.OrderedDict()
+        self.keys_by_jti: dict[int, set[tuple[str, str, str]]] = collections.defaultdict(set)
+
+    def _remove(self, cache_key: tuple[str, str, str]) -> None:
+        token = self.entries.pop(cache_key)[0]
+        if jti_keys := self.keys_by_jti.get(token.jti, None):
+            jti_keys.discard(cache_key)
+            if not jti_keys:
+                del self.keys_by_jti[token.jti]
+
+    def get(self, cache_key: tuple[str, str, str]) -> tuple[typing.Optional["TokenBase"], bool]:
+        """Returns cached token and whether its revocation must be re-checked, or (None, True) on cache miss."""
+        if not self.max_size:
+            return None, True
+
+        current_time = time.time()
+        with self.lock:
+            if not (entry := self.entries.get(cache_key, None)):
+                return None, True
+            if entry[1] <= current_time:
+                self._remove(cache_key)
+                return None, True
+
+            self.entries.move_to_end(cache_key)
+            return entry[0], entry[2] + self.revoke_check_interval <= current_time
+
+    def set(self, cache_key: tuple[str, str, str], token: "TokenBase") -> None:
+        if not self.max_size:
+            return
+
+        current_time = time.time()
+        with self.lock:
+            if cache_key in self.entries:
+                self._remove(cache_key)
+            while len(self.entries) >= self.max_size:
+                self._remove(next(iter(self.entries)))
+
+            self.entries[cache_key] = [token, token.exp.timestamp(), current_time]
+            self.keys_by_jti[token.jti].add(cache_key)
+
+    def evict_jti(self, jti: int) -> None:
+        with self.lock:
+            for cache_key in tuple(self.keys_by_jti.get(jti, ())):
+                self._remove(cache_key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_jti.clear()
+
+
+access_token_cache = VerifiedTokenCache(
+    max_size=flask.current_app.config.get("ACCESS_TOKEN_CACHE_SIZE", 0),
+    revoke_check_interval=flask.current_app.config.get("ACCESS_TOKEN_CACHE_REVOKE_CHECK_INTERVAL", 0),
+)
+token_revocation.revocation_set.revoke_callbacks.append(access_token_cache.evict_jti)
+
 
 class TokenBase:
     ALLOWED_CLAIM = ["api_ver", "iss", "exp", "user", "sub", "jti", "role", "otp"]
+    # Set on each subclass from ALLOWED_CLAIM, see __init_subclass__
+    CLAIM_NAMES: tuple[str, ...] = ()
+    claim_getter: typing.Callable[["TokenBase"], tuple] = None
 
     # This will raise error when env var "RESTAPI_VERSION" not set.
     api_ver: str = flask.current_app.config.get("RESTAPI_VERSION")
@@ -55,7 +152,13 @@ class TokenBase:
             return True
         return False
 
-    def create_token(self, key: str, algorithm: str = "HS256") -> str:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Claim names are sorted as inspect.getmembers did, so that issued tokens stay the same.
+        cls.CLAIM_NAMES = tuple(sorted(cls.ALLOWED_CLAIM))
+        cls.claim_getter = operator.attrgetter(*cls.CLAIM_NAMES)
+
+    def get_claims(self) -> dict[str, typing.Any]:
         if not self.sub:
             raise jwt.exceptions.MissingRequiredClaimError("Subject not set in JWT class")
         if self.user and type(self.user) == int and self.user < 0:
@@ -76,14 +179,32 @@ class TokenBase:
         if (not token_exp_time) or (token_exp_time < current_time):
             raise jwt.exceptions.ExpiredSignatureError("Token has reached expiration time")
 
-        result_payload = {}
-        attrs = inspect.getmembers(self, lambda o: not callable(o))
-
-        for attr_name, attr_value in attrs:
-            if attr_name in self.ALLOWED_CLAIM:
-                result_payload[attr_name] = attr_value
+        claims = dict(zip(self.CLAIM_NAMES, self.claim_getter(self)))
+        if isinstance(claims["exp"], datetime.datetime):
+            # Same as PyJWT's conversion, naive datetime is treated as UTC.
+            claims["exp"] = calendar.timegm(claims["exp"].utctimetuple())
+        return claims
+
+    @staticmethod
+    def encode_tokens(tokens: typing.Iterable["TokenBase"], key: str, algorithm: str = "HS256") -> list[str]:
+        """
+        Encode tokens with the same key, the output is same with jwt.encode.
+        JWT header segment and the signing key are prepared only once for all tokens.
+        """
+        header_segment = jwt_header_segment(algorithm)
+        algorithm_obj = jws.get_algorithm_by_name(algorithm)
+        prepared_key = algorithm_obj.prepare_key(key)
+
+        result: list[str] = []
+        for token in tokens:
+            payload = json.dumps(token.get_claims(), separators=(",", ":")).encode()
+            signing_input = header_segment + b"." + jwt.utils.base64url_encode(payload)
+            signature = algorithm_obj.sign(signing_input, prepared_key)
+            result.append((signing_input + b"." + jwt.utils.base64url_encode(signature)).decode())
+        return result
 
-        return jwt.encode(payload=result_payload, key=key, algorithm=algorithm)
+    def create_token(self, key: str, algorithm: str = "HS256") -> str:
+        return self.encode_tokens((self,), key, algorithm)[0]
 
     @classmethod
     def from_token(cls: typing.Type[T], jwt_input: str, key: str, algorithm: str = "HS256") -> T:
@@ -127,30 +248,39 @@ class AccessToken(TokenBase):
     _refresh_token: "RefreshToken" = None
 
     def create_token(self, key: str, algorithm: str = "HS256", exp_reset: bool = True) -> str:
-        if not db.session.query(RefreshToken).filter(RefreshToken.jti == self.jti).first():
-            raise Exception("Access Token could not be issued")
+        # Refresh token that this token was created from is already checked on primary, so don't query it again.
+        # Tokens loaded in other ways may come from a lagging replica, which may still have a revoked token.
+        refresh_token = self._refresh_token
+        if refresh_token is None or refresh_token.jti != self.jti or not refresh_token._verified_on_primary:
+            with db_module.use_primary():
+                if not db.session.query(RefreshToken).filter(RefreshToken.jti == self.jti).first():
+                    raise Exception("Access Token could not be issued")
 
         new_token = super().create_token(key, algorithm=algorithm)
 
         # If new token safely issued, then remove revoked history
-        redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(str(self.jti))
-        redis_result = redis_db.get(redis_key)
-        if redis_result and redis_result == b"revoked":
-            redis_db.delete(redis_key)
+        token_revocation.unrevoke_jti(self.jti)
 
         return new_token
 
     @classmethod
     def from_token(cls, jwt_input: str, key: str, algorithm: str = "HS256") -> "AccessToken":
-        parsed_token = super().from_token(jwt_input, key, algorithm)
-
-        # Check if token's revoked
-        redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(str(parsed_token.jti))
-        redis_result = redis_db.get(redis_key)
-        if redis_result and redis_result == b"revoked":
-            raise jwt.exceptions.InvalidTokenError("This token was revoked")
-
-        return parsed_token
+        # Clients use same access token until it expires, so verified token is cached.
+        # key contains CSRF token, so the token is not accepted on cache with other CSRF token.
+        cache_key = (jwt_input, key, algorithm)
+        parsed_token, revoke_check_required = access_token_cache.get(cache_key)
+        if parsed_token is None:
+            parsed_token = super().from_token(jwt_input, key, algorithm)
+
+        if revoke_check_required:
+            # Check if token's revoked
+            if is_jti_revoked(parsed_token.jti):
+                access_token_cache.evict_jti(parsed_token.jti)
+                raise jwt.exceptions.InvalidTokenError("This token was revoked")
+            access_token_cache.set(cache_key, parsed_token)
+
+        # Return a copy, so that the cached token is not modified by the caller.
+        return copy.copy(parsed_token)
 
     @classmethod
     def from_refresh_token(cls, refresh_token: "RefreshToken"):
@@ -205,10 +335,15 @@ class RefreshToken(TokenBase, db_module.BaseModel, db_module.DefaultModelMixin):
     )
 
     user_agent = db.Column(db.String, nullable=False)
+    # Parsed device type, OS and browser of user_agent. See app.common.utils.user_agent.get_fingerprint
+    user_agent_fingerprint = db.Column(db.String, nullable=True)
     # Token data for sending notification on specific client device.
     # Only available on mobile.
     client_token = db.Column(db.String, nullable=True)
 
+    # Set when this token is read from or written to primary in this session, see AccessToken.create_token
+    _verified_on_primary: bool = False
+
     @classmethod
     def from_usertable(cls, userdata: user_module.User) -> "RefreshToken":
         new_token = cls()
@@ -232,13 +367,17 @@ class RefreshToken(TokenBase, db_module.BaseModel, db_module.DefaultModelMixin):
         if not token_data.get("otp", ""):
             raise jwt.exceptions.InvalidTokenError("OTP field is empty")
 
-        # Get token data from DB using JTI
-        target_token = (
-            db.session.query(RefreshToken)
-            .filter(RefreshToken.jti == token_data.get("jti", -1))
-            .filter(RefreshToken.exp > current_time)
-            .first()
-        )
+        # Get token data from DB using JTI, token owner is loaded on the same query
+        # because refresh flow always needs the user data.
+        # This is read from primary, as a lagging replica may still have a revoked token or a locked user.
+        with db_module.use_primary():
+            target_token = (
+                db.session.query(RefreshToken)
+                .options(db.joinedload(RefreshToken.usertable))
+                .filter(RefreshToken.jti == token_data.get("jti", -1))
+                .filter(RefreshToken.exp > current_time)
+                .first()
+            )
         if not target_token:
             raise jwt.exceptions.InvalidTokenError("RefreshToken not found on DB")
 
@@ -253,11 +392,12 @@ class RefreshToken(TokenBase, db_module.BaseModel, db_module.DefaultModelMixin):
         cookie_token_exp = datetime.datetime.fromtimestamp(token_data.get("exp", 0), utils.UTC)
 
         if target_token.user == int(token_data.get("user", "")) and db_token_exp == cookie_token_exp:
+            target_token._verified_on_primary = True
             return target_token
         else:
             raise jwt.exceptions.InvalidTokenError("RefreshToken information mismatch")
 
-    def create_token(self, key: str, algorithm: str = "HS256", exp_reset: bool = True) -> str:
+    def create_token(self, key: str, algorithm: str = "HS256", exp_reset: bool = True, db_commit: bool = True) -> str:
         if exp_reset:
             self.exp = datetime.datetime.utcnow().replace(microsecond=0)  # Drop microseconds
             self.exp += refresh_token_valid_duration
@@ -269,11 +409,16 @@ class RefreshToken(TokenBase, db_module.BaseModel, db_module.DefaultModelMixin):
         if not self.otp:
             self.otp = str(int(secrets.token_hex(8), 16)).zfill(24)
 
+        # Without commit, token is only flushed to get JTI, and the caller must commit it.
         try:
-            db.session.commit()
+            if db_commit:
+                db.session.commit()
+            else:
+                db.session.flush()
         except Exception:
             db.session.rollback()
             raise
+        self._verified_on_primary = True
 
         return super().create_token(key, algorithm)
 
@@ -289,9 +434,7 @@ class AdminToken(TokenBase):
         parsed_token = super().from_token(jwt_input, key, algorithm)
 
         # Check if token's revoked
-        redis_key = RedisKeyType.TOKEN_REVOKE.as_redis_key(str(parsed_token.jti))
-        redis_result = redis_db.get(redis_key)
-        if redis_result and redis_result == b"revoked":
+        if is_jti_revoked(parsed_token.jti):
             raise jwt.exceptions.InvalidTokenError("This token was revoked")
 
         return parsed_token
@@ -332,6 +475,7 @@ def create_login_data(
     ip_addr: str,
     key: str,
     algorithm: str = "HS256",
+    db_commit: bool = True,
 ) -> tuple[list[tuple[str, str]], dict[str, typing.Any]]:
     restapi_version = flask.current_app.config.get("RESTAPI_VERSION")
     server_name = flask.current_app.config.get("SERVER_NAME")
@@ -343,9 +487,10 @@ def create_login_data(
 
     refresh_token = RefreshToken.from_usertable(user_data)
     refresh_token.user_agent = user_agent
+    refresh_token.user_agent_fingerprint = ua_fingerprint.get_fingerprint_or_none(user_agent)
     refresh_token.client_token = client_token
     refresh_token.ip_addr = ip_addr
-    refresh_token_jwt = refresh_token.create_token(key, algorithm, True)
+    refresh_token_jwt = refresh_token.create_token(key, algorithm, True, db_commit)
     refresh_token_cookie = utils.cookie_creator(
         name="refresh_token",
         data=refresh_token_jwt,
@@ -389,7 +534,7 @@ def create_login_data(
 
 
 def refresh_login_data(
-    refresh_token_jwt: str,
+    refresh_token: RefreshToken,
     user_agent: str,
     csrf_token: str,
     client_token: typing.Optional[str],
@@ -405,33 +550,18 @@ def refresh_login_data(
     response_header: list[tuple[str, str]] = []
     response_data: dict[str, dict[str, str]] = {}
 
-    refresh_token = RefreshToken.from_token(refresh_token_jwt, key)
-
     # Check device type/OS/browser using User-Agent.
     # We'll refresh token only if it's same with db records
     try:
-        db_ua: ua_parser.UserAgent = ua.parse(refresh_token.user_agent)
-        req_ua: ua_parser.UserAgent = ua.parse(user_agent)
-
-        check_result: bool = all(
-            (
-                all(
-                    (
-                        db_ua.is_mobile == req_ua.is_mobile,
-                        db_ua.is_tablet == req_ua.is_tablet,
-                        db_ua.is_pc == req_ua.is_pc,
-                    )
-                ),
-                db_ua.os.family == req_ua.os.family,
-                db_ua.browser.family == req_ua.browser.family,
-            )
+        # Tokens issued before fingerprint was introduced don't have it, so parse the stored User-Agent.
+        db_ua_fingerprint: str = refresh_token.user_agent_fingerprint or ua_fingerprint.get_fingerprint(
+            refresh_token.user_agent
         )
-        if not check_result:
-            raise jwt.exceptions.InvalidTokenError("User-Agent does not compatable")
-    except jwt.exceptions.InvalidTokenError:
-        raise
+        req_ua_fingerprint: str = ua_fingerprint.get_fingerprint(user_agent)
     except Exception:
         raise jwt.exceptions.InvalidTokenError("User-Agent not parsable")
+    if db_ua_fingerprint != req_ua_fingerprint:
+        raise jwt.exceptions.InvalidTokenError("User-Agent does not compatable")
 
     # Refresh token will be re-issued only when there's 10 days left until token expires
     token_exp_time = refresh_token.exp.replace(tzinfo=utils.UTC)
@@ -439,6 +569,7 @@ def refresh_login_data(
         try:
             # Re-issue refresh token
             refresh_token.user_agent = user_agent
+            refresh_token.user_agent_fingerprint = req_ua_fingerprint
             refresh_token.ip_addr = ip_addr
             refresh_token_jwt = refresh_token.create_token(key, algorithm, True)
             db.session.commit()
@@ -496,3 +627,48 @@ def refresh_login_data(
         }
 
     return response_header, response_data
+
+
+def revoke_refresh_tokens(*criterion: typing.Any, delete: bool = True, db_commit: bool = True) -> list[int]:
+    """
+    Revokes refresh tokens that match the criterion(ex: RefreshToken.user == 1),
+    and access tokens issued from them, and returns their JTIs.
+    Tokens are deleted with one DELETE statement, and revoked on Redis with one round trip per 1000 tokens,
+    so that this can be used on users with thousands of sessions.
+    Tokens are revoked on Redis only after the DB commit succeeded, so that Redis and DB don't disagree.
+    With db_commit=False, caller must pass returned JTIs to token_revocation.revoke_jti after its own commit.
+    """
+    if db.engine.dialect.full_returning and delete:
+        # Get JTIs from the DELETE statement itself, without SELECTing them first.
+        jtis: list[int] = (
+            db.session.execute(
+                sql.delete(RefreshToken)
+                .where(*criterion)
+                .returning(RefreshToken.jti)
+                .execution_options(synchronize_session=False)
+            )
+            .scalars()
+            .all()
+        )
+    else:
+        jtis = [z for (z,) in db.session.query(RefreshToken.jti).filter(*criterion)]
+        if delete and jtis:
+            db.session.query(RefreshToken).filter(RefreshToken.jti.in_(jtis)).delete(synchronize_session=False)
+
+    if db_commit:
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        token_revocation.revoke_jti(*jtis)
+
+    return jtis
+
+
+def revoke_user_tokens(user_uuid: int, delete: bool = True, db_commit: bool = True) -> list[int]:
+    return revoke_refresh_tokens(RefreshToken.user == user_uuid, delete=delete, db_commit=db_commit)
+
+
+def revoke_tokens_by_jti(jtis: typing.Iterable[int], delete: bool = True, db_commit: bool = True) -> list[int]:
+    return revoke_refresh_tokens(RefreshToken.jti.in_(list(jtis)), delete=delete, db_commit=db_commit)
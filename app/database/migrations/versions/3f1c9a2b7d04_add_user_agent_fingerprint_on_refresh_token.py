@@ -0,0 +1,23 @@
+"""Add user_agent_fingerprint on TB_REFRESH_TOKEN.
+
+Revision ID: 3f1c9a2b7d04
+Revises: 65933120c1fc
+Create Date: 2026-10-18 09:12:41.113207
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f1c9a2b7d04"
+down_revision = "65933120c1fc"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("TB_REFRESH_TOKEN", sa.Column("user_agent_fingerprint", sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("TB_REFRESH_TOKEN", "user_agent_fingerprint")
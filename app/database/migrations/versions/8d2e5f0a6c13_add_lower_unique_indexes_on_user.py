@@ -0,0 +1,53 @@
+"""Add lower(...) unique indexes on TB_USER.
+
+Revision ID: 8d2e5f0a6c13
+Revises: 3f1c9a2b7d04
+Create Date: 2026-10-18 14:27:05.481920
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d2e5f0a6c13"
+down_revision = "3f1c9a2b7d04"
+branch_labels = None
+depends_on = None
+
+LOWER_UNIQUE_INDEXES = {
+    "UX_User_lower_id": "id",
+    "UX_User_lower_nickname": "nickname",
+    "UX_User_lower_email": "email",
+}
+
+
+def upgrade():
+    # Unique index can't be created when values that differ only by case exist, so show them before failing.
+    conn = op.get_bind()
+    for column_name in LOWER_UNIQUE_INDEXES.values():
+        duplicates = (
+            conn.execute(
+                sa.text(f'SELECT lower({column_name}) FROM "TB_USER" GROUP BY lower({column_name}) HAVING count(*) > 1')
+            )
+            .scalars()
+            .all()
+        )
+        if duplicates:
+            raise RuntimeError(f"TB_USER.{column_name} has case-insensitive duplicates: {duplicates}")
+
+    # Build indexes without blocking writes on PostgreSQL, CONCURRENTLY can't run inside a transaction.
+    with op.get_context().autocommit_block():
+        for index_name, column_name in LOWER_UNIQUE_INDEXES.items():
+            op.create_index(
+                index_name,
+                "TB_USER",
+                [sa.text(f"lower({column_name})")],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name in LOWER_UNIQUE_INDEXES:
+            op.drop_index(index_name, table_name="TB_USER", postgresql_concurrently=True)
@@ -0,0 +1,37 @@
+"""Add content-addressed file store.
+
+Revision ID: c41a7e9d2b68
+Revises: 8d2e5f0a6c13
+Create Date: 2026-10-18 19:42:16.270358
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c41a7e9d2b68"
+down_revision = "8d2e5f0a6c13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "TB_FILE_BLOB",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("modified_at", sa.DateTime(), nullable=True),
+        sa.Column("commit_id", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+    # Existing files stay on the per-user directory with NULL content_hash, until `flask file-store-migrate`.
+    op.add_column("TB_UPLOADED_FILE", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index("IX_UploadedFile_content_hash", "TB_UPLOADED_FILE", ["content_hash"])
+
+
+def downgrade():
+    op.drop_index("IX_UploadedFile_content_hash", table_name="TB_UPLOADED_FILE")
+    op.drop_column("TB_UPLOADED_FILE", "content_hash")
+    op.drop_table("TB_FILE_BLOB")
@@ -0,0 +1,158 @@
+import typing
+import urllib.parse
+
+import redis
+import redis.backoff
+import redis.exceptions
+import redis.retry
+import redis.sentinel
+
+import app.common.utils.metrics as metrics
+
+# Connection pool of this process, shared by redis_db, rate limiter and everything else on the app.
+connection_pool: redis.ConnectionPool = None
+
+
+def get_connection_options(config: typing.Mapping[str, typing.Any]) -> dict[str, typing.Any]:
+    """Options for every Redis connection, so that a Redis hiccup fails fast and is retried, instead of hanging."""
+    return {
+        "socket_timeout": float(config.get("REDIS_SOCKET_TIMEOUT", 5)),
+        "socket_connect_timeout": float(config.get("REDIS_SOCKET_CONNECT_TIMEOUT", 2)),
+        "socket_keepalive": True,
+        "health_check_interval": int(config.get("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+        "retry": redis.retry.Retry(
+            redis.backoff.ExponentialBackoff(cap=1.0, base=0.05),
+            int(config.get("REDIS_RETRY_COUNT", 3)),
+        ),
+        "retry_on_error": [redis.exceptions.ConnectionError, redis.exceptions.TimeoutError],
+    }
+
+
+def get_redis_url(config: typing.Mapping[str, typing.Any]) -> str:
+    if redis_url := config.get("REDIS_URL"):
+        return redis_url
+
+    redis_password = config.get("REDIS_PASSWORD", None)
+    return (
+        f"redis://{f':{urllib.parse.quote(redis_password)}@' if redis_password else ''}"
+        f'{config.get("REDIS_HOST")}:{config.get("REDIS_PORT")}/{config.get("REDIS_DB", 0)}'
+    )
+
+
+def parse_sentinel_url(redis_url: str) -> tuple[list[tuple[str, int]], str, int, typing.Optional[str]]:
+    """
+    Parses redis+sentinel://[:password@]host:port[,host:port...]/service_name[/db]
+    and returns (sentinel addresses, service name, db, password)
+    """
+    parsed_url = urllib.parse.urlsplit(redis_url)
+    password = urllib.parse.unquote(parsed_url.password) if parsed_url.password else None
+
+    sentinels: list[tuple[str, int]] = []
+    for address in parsed_url.netloc.rsplit("@", 1)[-1].split(","):
+        host, _, port = address.partition(":")
+        sentinels.append((host, int(port or 26379)))
+
+    service_name, _, db = parsed_url.path.strip("/").partition("/")
+    return sentinels, service_name, int(db or 0), password
+
+
+def create_connection_pool(config: typing.Mapping[str, typing.Any]) -> redis.ConnectionPool:
+    connection_options = get_connection_options(config)
+    max_connections = int(config.get("REDIS_MAX_CONNECTIONS", 64))
+    redis_url = get_redis_url(config)
+
+    if redis_url.startswith("redis+sentinel://"):
+        sentinels, service_name, db, password = parse_sentinel_url(redis_url)
+        sentinel_manager = redis.sentinel.Sentinel(
+            sentinels,
+            sentinel_kwargs={"password": password, **connection_options},
+            password=password,
+            db=db,
+            **connection_options,
+        )
+        return redis.sentinel.SentinelConnectionPool(
+            service_name,
+            sentinel_manager,
+            max_connections=max_connections,
+            password=password,
+            db=db,
+            **connection_options,
+        )
+
+    # Blocking pool makes greenlets wait for a free connection up to REDIS_POOL_TIMEOUT,
+    # instead of opening connections without limit when Redis slows down.
+    return redis.BlockingConnectionPool.from_url(
+        redis_url,
+        max_connections=max_connections,
+        timeout=float(config.get("REDIS_POOL_TIMEOUT", 5)),
+        **connection_options,
+    )
+
+
+def get_celery_config(config: typing.Mapping[str, typing.Any]) -> dict[str, typing.Any]:
+    """Celery runs on its own process with its own connections, but with the same Redis and connection options."""
+    connection_options = get_connection_options(config)
+    transport_options: dict[str, typing.Any] = {
+        "socket_timeout": connection_options["socket_timeout"],
+        "socket_connect_timeout": connection_options["socket_connect_timeout"],
+        "socket_keepalive": True,
+        "health_check_interval": connection_options["health_check_interval"],
+        "retry_on_timeout": True,
+        "max_connections": int(config.get("REDIS_MAX_CONNECTIONS", 64)),
+    }
+
+    backend_transport_options: dict[str, typing.Any] = {}
+
+    redis_url = get_redis_url(config)
+    if redis_url.startswith("redis+sentinel://"):
+        # Celery and kombu take sentinels as "sentinel://host:port;sentinel://host:port" with master_name option
+        sentinels, service_name, db, password = parse_sentinel_url(redis_url)
+        auth = f":{urllib.parse.quote(password)}@" if password else ""
+        redis_url = ";".join(f"sentinel://{auth}{host}:{port}/{db}" for host, port in sentinels)
+        transport_options.update({"master_name": service_name, "sentinel_kwargs": {"password": password}})
+        backend_transport_options.update({"master_name": service_name, "sentinel_kwargs": {"password": password}})
+
+    return {
+        "broker_url": config.get("CELERY_BROKER_URL") or redis_url,
+        "result_backend": redis_url,
+        "broker_transport_options": transport_options,
+        "result_backend_transport_options": backend_transport_options,
+        "redis_socket_timeout": connection_options["socket_timeout"],
+        "redis_socket_connect_timeout": connection_options["socket_connect_timeout"],
+        "redis_retry_on_timeout": True,
+        "redis_socket_keepalive": True,
+        "redis_backend_health_check_interval": connection_options["health_check_interval"],
+        "redis_max_connections": transport_options["max_connections"],
+    }
+
+
+def get_pool_metrics() -> dict[str, typing.Any]:
+    if connection_pool is None:
+        return {}
+
+    if isinstance(connection_pool, redis.BlockingConnectionPool):
+        # Idle connections are in the queue, and not-yet-created slots are None in the queue.
+        idle_count = sum(1 for z in list(connection_pool.pool.queue) if z is not None)
+        created_count = len(connection_pool._connections)
+    else:
+        idle_count = len(connection_pool._available_connections)
+        created_count = connection_pool._created_connections
+
+    return {
+        "max_connections": connection_pool.max_connections,
+        "created": created_count,
+        "in_use": created_count - idle_count,
+        "idle": idle_count,
+        "utilization": (created_count - idle_count) / connection_pool.max_connections,
+    }
+
+
+def init_app(app):
+    global connection_pool
+
+    # No connection is made until the first command, so this is safe to call on any context.
+    connection_pool = create_connection_pool(app.config)
+    metrics.register_collector("redis_pool", get_pool_metrics)
+
+    # init_app must return app
+    return app
@@ -0,0 +1,215 @@
+import datetime
+import logging
+import os
+import threading
+import time
+import typing
+
+import flask
+import redis
+
+import app.database as db_module
+
+logger = logging.getLogger(__name__)
+
+redis_db: redis.StrictRedis = db_module.redis_db
+RedisKeyType = db_module.RedisKeyType
+
+# Revoked token is kept on Redis for 2 weeks, which is longer than any token's lifetime.
+TOKEN_REVOKE_DURATION: datetime.timedelta = datetime.timedelta(weeks=2)
+# Every revocation change is published on this channel as "revoke:<jti>[,<jti>...]:<expire unix time>"
+# or "unrevoke:<jti>"
+TOKEN_REVOKE_CHANNEL: str = RedisKeyType.TOKEN_REVOKE.as_redis_key("feed")
+TOKEN_REVOKE_KEY_PREFIX: str = RedisKeyType.TOKEN_REVOKE.as_redis_key("")
+# Sorted set of revoked JTIs scored by expire unix time, so that revocations can be listed and pruned in bulk.
+# Keys of each JTI are still kept, for GET fallback of is_revoked.
+TOKEN_REVOKE_INDEX: str = RedisKeyType.TOKEN_REVOKE.as_redis_key("index")
+# Set when revocations made before the index was introduced are copied to the index.
+TOKEN_REVOKE_INDEX_BUILT: str = RedisKeyType.TOKEN_REVOKE.as_redis_key("index_built")
+# Number of JTIs sent on one Redis round trip and one feed message
+TOKEN_REVOKE_BATCH_SIZE: int = 1000
+
+
+class RevocationSet:
+    """
+    Local copy of revoked JTIs on Redis, so that checking a token that is not revoked needs no network call.
+    The set is bootstrapped from TOKEN_REVOKE keys on Redis and kept current by TOKEN_REVOKE_CHANNEL,
+    with a listener thread per process. Until the listener is subscribed and bootstrapped,
+    or when the connection is lost, is_revoked falls back to GET on Redis.
+    """
+
+    def __init__(self, enabled: bool, reconnect_delay: float = 1.0):
+        self.enabled = enabled
+        self.reconnect_delay = reconnect_delay
+
+        self.lock = threading.Lock()
+        # JTI -> unix time when the revocation expires on Redis
+        self.revoked: dict[int, float] = {}
+        self.ready: bool = False
+        self.listener_pid: int = 0
+        # Functions that are called with JTI when a token is revoked
+        self.revoke_callbacks: list[typing.Callable[[int], typing.Any]] = []
+
+    def start(self) -> None:
+        # Listener thread does not survive fork, so this must be checked on each worker process.
+        if not self.enabled or redis_db is None or self.listener_pid == os.getpid():
+            return
+        with self.lock:
+            if self.listener_pid == os.getpid():
+                return
+            self.listener_pid = os.getpid()
+            self.ready = False
+            self.revoked = {}
+
+        threading.Thread(target=self.listen, name="token-revocation-listener", daemon=True).start()
+
+    def bootstrap(self) -> None:
+        if not redis_db.exists(TOKEN_REVOKE_INDEX_BUILT):
+            build_revocation_index()
+
+        revoked_index = redis_db.zrangebyscore(TOKEN_REVOKE_INDEX, time.time(), "+inf", withscores=True)
+        revoked: dict[int, float] = {int(jti): expire_time for jti, expire_time in revoked_index}
+
+        with self.lock:
+            self.revoked = revoked
+
+    def apply_message(self, message: bytes) -> None:
+        action, jti_list, *args = message.decode().split(":")
+        jtis = [int(z) for z in jti_list.split(",")]
+
+        if action == "revoke":
+            expire_time = float(args[0]) if args else float("inf")
+            with self.lock:
+                self.revoked.update(dict.fromkeys(jtis, expire_time))
+            for callback in self.revoke_callbacks:
+                for jti in jtis:
+                    callback(jti)
+        elif action == "unrevoke":
+            with self.lock:
+                for jti in jtis:
+                    self.revoked.pop(jti, None)
+
+    def listen(self) -> None:
+        while self.listener_pid == os.getpid():
+            pubsub = redis_db.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before bootstrapping, so that no revocation is missed between them.
+                pubsub.subscribe(TOKEN_REVOKE_CHANNEL)
+                pubsub.get_message(timeout=self.reconnect_delay)
+                self.bootstrap()
+                self.ready = True
+
+                # Poll instead of pubsub.listen(), as a blocking read on an idle channel
+                # would hit REDIS_SOCKET_TIMEOUT and drop the subscription.
+                while self.listener_pid == os.getpid():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.apply_message(message["data"])
+            except Exception:
+                logger.exception("Token revocation feed disconnected, falling back to Redis until reconnected")
+            finally:
+                self.ready = False
+                pubsub.close()
+
+            time.sleep(self.reconnect_delay)
+
+    def is_revoked(self, jti: int) -> bool:
+        self.start()
+        if not self.ready:
+            redis_result = redis_db.get(RedisKeyType.TOKEN_REVOKE.as_redis_key(str(jti)))
+            return bool(redis_result and redis_result == b"revoked")
+
+        if (expire_time := self.revoked.get(jti, None)) is None:
+            return False
+        if expire_time <= time.time():
+            with self.lock:
+                self.revoked.pop(jti, None)
+            return False
+        return True
+
+
+revocation_set = RevocationSet(enabled=flask.current_app.config.get("TOKEN_REVOKE_FEED_ENABLE", False))
+
+
+def revoke_jti(*jtis: int) -> None:
+    """
+    Mark tokens as revoked on Redis and publish it to every process.
+    JTIs are sent in batches of TOKEN_REVOKE_BATCH_SIZE, each batch is one Redis round trip and one feed message.
+    """
+    expire_time = int(time.time() + TOKEN_REVOKE_DURATION.total_seconds())
+    for batch_start in range(0, len(jtis), TOKEN_REVOKE_BATCH_SIZE):
+        jti_batch = jtis[batch_start : batch_start + TOKEN_REVOKE_BATCH_SIZE]
+        feed_message = f"revoke:{','.join(map(str, jti_batch))}:{expire_time}"
+
+        redis_pipeline = redis_db.pipeline(transaction=False)
+        for jti in jti_batch:
+            redis_pipeline.set(RedisKeyType.TOKEN_REVOKE.as_redis_key(str(jti)), "revoked", TOKEN_REVOKE_DURATION)
+        redis_pipeline.zadd(TOKEN_REVOKE_INDEX, dict.fromkeys(jti_batch, expire_time))
+        redis_pipeline.zremrangebyscore(TOKEN_REVOKE_INDEX, "-inf", time.time())
+        redis_pipeline.publish(TOKEN_REVOKE_CHANNEL, feed_message)
+        redis_pipeline.execute()
+
+        # Apply this on current process immediately, without waiting for the feed.
+        revocation_set.apply_message(feed_message.encode())
+
+
+def unrevoke_jti(jti: int) -> None:
+    """Remove revoked history of the token and publish it to every process."""
+    if revocation_set.is_revoked(jti):
+        redis_pipeline = redis_db.pipeline(transaction=False)
+        redis_pipeline.delete(RedisKeyType.TOKEN_REVOKE.as_redis_key(str(jti)))
+        redis_pipeline.zrem(TOKEN_REVOKE_INDEX, jti)
+        redis_pipeline.publish(TOKEN_REVOKE_CHANNEL, f"unrevoke:{jti}")
+        redis_pipeline.execute()
+
+        revocation_set.apply_message(f"unrevoke:{jti}".encode())
+
+
+def get_revoked_page(offset: int, count: int) -> tuple[int, list[tuple[int, float]]]:
+    """Returns number of revoked tokens, and (JTI, expire unix time) of a page, latest revocation first."""
+    redis_pipeline = redis_db.pipeline(transaction=False)
+    redis_pipeline.zremrangebyscore(TOKEN_REVOKE_INDEX, "-inf", time.time())
+    redis_pipeline.zcard(TOKEN_REVOKE_INDEX)
+    redis_pipeline.zrevrange(TOKEN_REVOKE_INDEX, offset, offset + count - 1, withscores=True)
+    _, total, revoked_page = redis_pipeline.execute()
+    return total, [(int(jti), expire_time) for jti, expire_time in revoked_page]
+
+
+def prune_revocation_index() -> int:
+    """Removes expired revocations from the index, and returns how many were removed."""
+    return redis_db.zremrangebyscore(TOKEN_REVOKE_INDEX, "-inf", time.time())
+
+
+def build_revocation_index() -> int:
+    """
+    Copies revocations that were made before the index was introduced, from each JTI's key to the index.
+    This scans the whole TOKEN_REVOKE keyspace, so this runs only once, on the first bootstrap.
+    """
+    current_time = time.time()
+    revoked: dict[int, float] = {}
+    # Index, index_built and other keys share the TOKEN_REVOKE prefix, and the index is not a string.
+    # Only keys of JTIs are read, as GET on the index would fail with WRONGTYPE.
+    redis_keys: list[bytes] = [
+        redis_key
+        for redis_key in redis_db.scan_iter(match=TOKEN_REVOKE_KEY_PREFIX + "[0-9]*", count=1000)
+        if redis_key.decode().removeprefix(TOKEN_REVOKE_KEY_PREFIX).isdigit()
+    ]
+    for batch_start in range(0, len(redis_keys), TOKEN_REVOKE_BATCH_SIZE):
+        key_batch = redis_keys[batch_start : batch_start + TOKEN_REVOKE_BATCH_SIZE]
+        redis_pipeline = redis_db.pipeline(transaction=False)
+        for redis_key in key_batch:
+            redis_pipeline.get(redis_key)
+            redis_pipeline.pttl(redis_key)
+        pipeline_result = redis_pipeline.execute()
+
+        for redis_key, redis_value, redis_pttl in zip(key_batch, pipeline_result[::2], pipeline_result[1::2]):
+            jti = redis_key.decode().removeprefix(TOKEN_REVOKE_KEY_PREFIX)
+            if redis_value == b"revoked":
+                revoked[int(jti)] = current_time + redis_pttl / 1000 if redis_pttl > 0 else float("inf")
+
+    redis_pipeline = redis_db.pipeline(transaction=False)
+    if revoked:
+        redis_pipeline.zadd(TOKEN_REVOKE_INDEX, revoked)
+    redis_pipeline.set(TOKEN_REVOKE_INDEX_BUILT, "1")
+    redis_pipeline.execute()
+    return len(revoked)
@@ -1,9 +1,99 @@
+import datetime
+import pathlib as pt
+import secrets
+import typing
+
+import sqlalchemy as sql
+import sqlalchemy.dialects.postgresql as sqldlc_psql
+import sqlalchemy.dialects.sqlite as sqldlc_sqlite
+
 import app.common.utils as utils
 import app.database as db_module
 import app.database.user as user_module
 
 db = db_module.db
 
+USER_CONTENT_DIR = pt.Path.cwd() / "user_content"
+# Files uploaded before the content-addressed store, on <uploader uuid>/<filename>
+USER_CONTENT_UPLOAD_DIR = USER_CONTENT_DIR / "uploads"
+# Content-addressed store, each content is kept once on <hash[:2]>/<hash[2:4]>/<SHA-256 hex digest>
+USER_CONTENT_BLOB_DIR = USER_CONTENT_DIR / "blobs"
+UPSERT_INSERT_BY_DIALECT = {
+    "postgresql": sqldlc_psql.insert,
+    "sqlite": sqldlc_sqlite.insert,
+}
+
+
+def get_blob_path(content_hash: str) -> pt.Path:
+    return USER_CONTENT_BLOB_DIR / content_hash[:2] / content_hash[2:4] / content_hash
+
+
+class FileBlob(db_module.DefaultModelMixin, db_module.BaseModel):
+    """File content stored once, shared by every UploadedFile with the same content."""
+
+    __tablename__ = "TB_FILE_BLOB"
+    content_hash = db.Column(db.String(64), primary_key=True, nullable=False)  # SHA-256 hex digest
+    size = db.Column(db.BigInteger, nullable=False)
+    # Number of UploadedFile rows that are not deleted and refer this blob
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+
+    @classmethod
+    def add_reference(cls, content_hash: str, size: int) -> None:
+        """
+        Counts a new reference of the content, creating the blob row if needed.
+        Call this before placing the blob file, as this waits for collect_garbage of the same blob to finish.
+        """
+        insert = UPSERT_INSERT_BY_DIALECT.get(db.engine.dialect.name, None)
+        if not insert:
+            raise NotImplementedError(f"FileBlob upsert for {db.engine.dialect.name} is not implemented yet!")
+
+        table = cls.__table__
+        db.session.execute(
+            insert(table)
+            .values(content_hash=content_hash, size=size, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[table.c.content_hash],
+                set_={
+                    "ref_count": table.c.ref_count + 1,
+                    "modified_at": sql.func.now(),
+                    "commit_id": secrets.token_hex(),
+                },
+            )
+        )
+
+    @classmethod
+    def release_reference(cls, content_hash: str) -> None:
+        table = cls.__table__
+        db.session.execute(
+            sql.update(table)
+            .where(table.c.content_hash == content_hash, table.c.ref_count > 0)
+            .values(ref_count=table.c.ref_count - 1, modified_at=sql.func.now(), commit_id=secrets.token_hex())
+        )
+
+    @classmethod
+    def collect_garbage(cls, *content_hashes: str) -> int:
+        """
+        Deletes blobs that no UploadedFile refers(only the given ones if any), with their files.
+        Each file is removed before its row delete is committed, so that add_reference of the same content
+        waits until the file is gone, and the upload places the file again.
+        """
+        table = cls.__table__
+        unreferenced_query = sql.select(table.c.content_hash).where(table.c.ref_count == 0)
+        if content_hashes:
+            unreferenced_query = unreferenced_query.where(table.c.content_hash.in_(content_hashes))
+
+        collected_count = 0
+        for content_hash in db.session.execute(unreferenced_query).scalars().all():
+            delete_result = db.session.execute(
+                sql.delete(table).where(table.c.content_hash == content_hash, table.c.ref_count == 0)
+            )
+            if delete_result.rowcount:
+                get_blob_path(content_hash).unlink(missing_ok=True)
+                collected_count += 1
+            db.session.commit()
+
+        return collected_count
+
 
 class UploadedFile(db_module.DefaultModelMixin, db_module.BaseModel):
     __tablename__ = "TB_UPLOADED_FILE"
@@ -15,6 +105,8 @@ class UploadedFile(db_module.DefaultModelMixin, db_module.BaseModel):
     mimetype = db.Column(db.String, nullable=False)
     size = db.Column(db.Integer, nullable=False)
     filename = db.Column(db.String, unique=True, nullable=False)
+    # Content on the content-addressed store. This is NULL on files uploaded before the store, until migrated.
+    content_hash = db.Column(db.String(64), nullable=True)
     original_filename = db.Column(db.String, nullable=False)
     additional_data = db.Column(db.String, nullable=True)  # JSON parsable data
     alternative_data = db.Column(db.String, nullable=True)  # JSON parsable data
@@ -33,6 +125,23 @@ class UploadedFile(db_module.DefaultModelMixin, db_module.BaseModel):
     readable = db.Column(db.Boolean, default=True, nullable=False)
     writable = db.Column(db.Boolean, default=False, nullable=False)  # Placeholder for the future
 
+    __table_args__ = (db.Index("IX_UploadedFile_content_hash", content_hash),)
+
+    def get_path(self) -> pt.Path:
+        if self.content_hash:
+            return get_blob_path(self.content_hash)
+        return USER_CONTENT_UPLOAD_DIR / str(self.uploaded_by_id) / self.filename
+
+    def mark_deleted(self, deleted_by_id: typing.Optional[int] = None) -> None:
+        """
+        Soft-deletes this file and releases its content.
+        Call FileBlob.collect_garbage(content_hash) after commit to remove the content if this was the last reference.
+        """
+        self.deleted_at = utils.as_utctime(datetime.datetime.now())
+        self.deleted_by_id = deleted_by_id
+        if self.content_hash:
+            FileBlob.release_reference(self.content_hash)
+
     def to_dict(self):
         result = {"resource": "file"}
 
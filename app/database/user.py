@@ -6,8 +6,10 @@ import typing
 
 import flask
 import jwt
-from passlib.hash import argon2
+import sqlalchemy as sql
+import sqlalchemy.orm.attributes as sql_orm_attr
 
+import app.common.password_hasher as password_hasher
 import app.common.utils as utils
 import app.database as db_module
 
@@ -47,6 +49,14 @@ class User(db_module.DefaultModelMixin, db_module.BaseModel):
 
     role = db.Column(db.String, default=None, nullable=True)
 
+    # User lookups compare lower(...), these indexes make them use index scan,
+    # and also keep ID, nickname and email unique case-insensitively.
+    __table_args__ = (
+        db.Index("UX_User_lower_id", db.func.lower(id), unique=True),
+        db.Index("UX_User_lower_nickname", db.func.lower(nickname), unique=True),
+        db.Index("UX_User_lower_email", db.func.lower(email), unique=True),
+    )
+
     posts: list = None  # placeholder for backref
 
     @classmethod
@@ -60,12 +70,12 @@ class User(db_module.DefaultModelMixin, db_module.BaseModel):
             return False
 
         # Try verification with password they entered without trimming.
-        # If it fails, silently try it with trimming.
+        # If it fails, silently try it with trimming, only when trimming changes it.
+        candidates = (pw, stripped_pw) if (stripped_pw := pw.strip()) != pw else (pw,)
         try:
-            result = argon2.verify(pw, self.password)
-            if not result:
-                result = argon2.verify(pw.strip(), self.password)
-            return result
+            return password_hasher.password_hasher.verify(self.password, *candidates)
+        except password_hasher.PasswordHasherBusyError:
+            raise
         except Exception:
             return False
 
@@ -88,7 +98,9 @@ class User(db_module.DefaultModelMixin, db_module.BaseModel):
             return False, "PW_REUSED_ON_ID_EMAIL_NICK"
 
         try:
-            self.password = argon2.hash(new_pw)
+            self.password = password_hasher.password_hasher.hash(new_pw)
+        except password_hasher.PasswordHasherBusyError:
+            raise
         except Exception:
             return False, "UNKNOWN_ERROR"
 
@@ -112,6 +124,7 @@ class User(db_module.DefaultModelMixin, db_module.BaseModel):
         try:
             if db_commit:
                 db.session.commit()
+                self.forget_available_identifiers(id=new_id)
 
             return True, ""
         except Exception:
@@ -119,7 +132,9 @@ class User(db_module.DefaultModelMixin, db_module.BaseModel):
             return False, "DB_ERROR"
 
     @classmethod
-    def try_login(cls, user_ident: str, pw: str) -> tuple["User" | typing.Literal[False], str]:
+    def try_login(cls, user_ident: str, pw: str, db_commit: bool = True) -> tuple["User" | typing.Literal[False], str]:
+        # Failed login is always committed. With db_commit=False, successful login is written but not committed,
+        # so that the caller can commit it with the refresh token in one transaction.
         SIGNIN_POSSIBLE_AFTER_MAIL_VERIFICATION = flask.current_app.config.get(
             "SIGNIN_POSSIBLE_AFTER_MAIL_VERIFICATION"
         )
@@ -176,15 +191,112 @@ class User(db_module.DefaultModelMixin, db_module.BaseModel):
                 return False, "DB_ERROR"
 
         # If password is correct and account is not locked, process login.
-        self.last_login_date = db.func.now()
-        self.login_fail_count = 0
         try:
-            db.session.commit()
+            self._record_login(pw)
+            if db_commit:
+                db.session.commit()
             return self, ""
         except Exception:
             db.session.rollback()
             return self, "DB_ERROR"
 
+    def _record_login(self, pw: str) -> None:
+        # Writes successful login, the caller must commit or rollback this.
+        login_values: dict[str, typing.Any] = {"last_login_date": db.func.now(), "login_fail_count": 0}
+
+        # Upgrade the hash if it was made with outdated parameters.
+        # Login must not fail by this, old hash is kept and rehash will be tried again on next login.
+        hasher = password_hasher.password_hasher
+        if hasher.needs_rehash(self.password):
+            try:
+                login_values["password"] = hasher.hash(pw)
+            except Exception:
+                pass
+
+        if db.engine.dialect.full_returning:
+            # Get DB-side values on the same statement, so that they don't need to be reloaded.
+            user_table: sql.Table = User.__table__
+            updated_row = db.session.execute(
+                sql.update(user_table)
+                .where(user_table.c.uuid == self.uuid)
+                .values(**login_values)
+                .returning(user_table.c.last_login_date, user_table.c.modified_at, user_table.c.commit_id)
+            ).one()
+            login_values.update(updated_row._mapping)
+            for column_name, value in login_values.items():
+                sql_orm_attr.set_committed_value(self, column_name, value)
+        else:
+            for column_name, value in login_values.items():
+                setattr(self, column_name, value)
+            db.session.flush()
+
+    @classmethod
+    def get_used_identifiers(cls, candidates: dict[str, set[str]]) -> dict[str, set[str]]:
+        """
+        Returns values that are already used, of each column in id, nickname and email.
+        Candidates must be normalized with normalize_identifier. All columns are checked on one query,
+        and available values are cached on Redis for a short time, as signup forms check them on every keystroke.
+        Query goes to a read replica only when the cache is disabled, so a lagging replica is never cached.
+        """
+        cache_ttl: int = flask.current_app.config.get("DUPLICATE_CHECK_CACHE_TTL", 0)
+        candidate_keys = [(column_name, value) for column_name, values in candidates.items() for value in values]
+        if not candidate_keys:
+            return {}
+
+        if cache_ttl:
+            redis_keys = [cls.get_available_identifier_redis_key(*z) for z in candidate_keys]
+            candidate_keys = [z for z, cached in zip(candidate_keys, redis_db.mget(redis_keys)) if not cached]
+
+        used_identifiers: dict[str, set[str]] = {}
+        if candidate_keys:
+            uncached_candidates: dict[str, set[str]] = {}
+            for column_name, value in candidate_keys:
+                uncached_candidates.setdefault(column_name, set()).add(value)
+
+            query = sql.union_all(
+                *(
+                    sql.select(sql.literal(column_name), db.func.lower(getattr(User, column_name))).where(
+                        db.func.lower(getattr(User, column_name)).in_(values)
+                    )
+                    for column_name, values in uncached_candidates.items()
+                )
+            )
+            # Replica may not have a user who signed up just now yet, and caching that as available
+            # would hide the user for the whole TTL, so fill the cache only from primary.
+            with db_module.use_primary() if cache_ttl else db_module.read_replica():
+                for column_name, value in db.session.execute(query):
+                    used_identifiers.setdefault(column_name, set()).add(value)
+
+            if cache_ttl:
+                redis_pipeline = redis_db.pipeline(transaction=False)
+                for column_name, value in candidate_keys:
+                    if value not in used_identifiers.get(column_name, ()):
+                        redis_pipeline.set(cls.get_available_identifier_redis_key(column_name, value), "1", cache_ttl)
+                redis_pipeline.execute()
+
+        return used_identifiers
+
+    @classmethod
+    def forget_available_identifiers(cls, **identifiers: str) -> None:
+        """Removes cached availability of the values, must be called after values are committed to DB."""
+        if not flask.current_app.config.get("DUPLICATE_CHECK_CACHE_TTL", 0):
+            return
+
+        redis_keys = [
+            cls.get_available_identifier_redis_key(k, cls.normalize_identifier(v)) for k, v in identifiers.items() if v
+        ]
+        if redis_keys:
+            redis_db.delete(*redis_keys)
+
+    @staticmethod
+    def normalize_identifier(value: str) -> str:
+        # Identifiers are unique case-insensitively, so they're cached and compared in this form.
+        return utils.normalize(value.strip()).lower()
+
+    @staticmethod
+    def get_available_identifier_redis_key(column_name: str, value: str) -> str:
+        return RedisKeyType.ACCOUNT_AVAILABLE.as_redis_key(f"{column_name}:{value}")
+
     def to_dict(self):
         return {
             "uuid": self.uuid,
@@ -8,6 +8,7 @@ import flask_limiter.util
 import flask_migrate
 
 import app.database as db_module
+import app.database.redis_connection as redis_connection
 
 db = db_module.db
 
@@ -16,18 +17,13 @@ def init_app(app: flask.Flask):
     # Do additional plugin set-ups here
     runable_app = app
 
-    # Rate-limit our API
-    limiter_storage_url = "redis://"
-    redis_password = app.config.get("REDIS_PASSWORD", None)
-    if redis_password:
-        limiter_storage_url += f":{redis_password}@"
-    limiter_storage_url += f'{app.config.get("REDIS_HOST")}:{app.config.get("REDIS_PORT")}'
-
+    # Rate-limit our API, on the same Redis connection pool with the app
     limiter = flask_limiter.Limiter(  # noqa: F841
         runable_app,
         key_func=flask_limiter.util.get_remote_address,
         default_limits=["3 per second"],
-        storage_uri=limiter_storage_url,
+        storage_uri="redis://",
+        storage_options={"connection_pool": redis_connection.connection_pool},
     )
 
     # Migrate database
@@ -2,11 +2,13 @@ import os
 
 import celery
 
-REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD", None)
-REDIS_HOST = os.environ.get("REDIS_HOST")
-REDIS_PORT = os.environ.get("REDIS_PORT")
-CELERY_BACKEND_URL = f"redis://{f':{REDIS_PASSWORD}@' if REDIS_PASSWORD else ''}{REDIS_HOST}:{REDIS_PORT}"
-CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", CELERY_BACKEND_URL)
+import app.config as config_module
+import app.database.redis_connection as redis_connection
+
+# Worker shares Redis address and connection options (timeouts, health check, retry) with the app config.
+worker_config = config_module.config_by_name[os.environ.get("FLASK_ENV", "production")]
+worker_redis_config = {k: getattr(worker_config, k) for k in dir(worker_config) if k.isupper()}
+worker_redis_config.setdefault("CELERY_BROKER_URL", os.environ.get("CELERY_BROKER_URL", None))
 
 internal_celery_app: celery.Celery = None
 
@@ -15,11 +17,8 @@ def init_celery_app():
     global internal_celery_app
 
     if internal_celery_app is None:
-        internal_celery_app = celery.Celery(
-            main="userdbmod1",
-            backend=CELERY_BACKEND_URL,
-            broker=CELERY_BROKER_URL,
-        )
+        internal_celery_app = celery.Celery(main="userdbmod1")
+        internal_celery_app.conf.update(redis_connection.get_celery_config(worker_redis_config))
         internal_celery_app.conf.task_ignore_result = True
 
     import app.worker.project_worker as project_worker  # noqa: F401
@@ -0,0 +1,8 @@
+import os
+
+# app.config reads these on import, tests don't need a real Redis or DB server.
+os.environ.setdefault("FLASK_ENV", "testing")
+os.environ.setdefault("REDIS_HOST", "localhost")
+os.environ.setdefault("REDIS_PORT", "6379")
+os.environ.setdefault("REDIS_DB", "0")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
@@ -0,0 +1,65 @@
+import datetime
+import unittest
+
+import flask
+import flask.views
+import yaml
+
+import app.api.helper_class as api_class
+
+
+class DatetimeFieldTest(unittest.TestCase):
+    """Fields declared with `format: date` or `format: date-time` are parsed to datetime."""
+
+    def setUp(self):
+        class EchoRoute(flask.views.MethodView):
+            @api_class.RequestBody(
+                required_fields={"birthday": {"type": "string", "format": "date"}},
+                optional_fields={"since": {"type": "string", "format": "date-time"}, "nickname": {"type": "string"}},
+            )
+            def post(self, req_body: dict):
+                """
+                description: Echo parsed datetimes.
+                responses: []
+                """
+                return flask.jsonify(
+                    {
+                        "since": req_body["since"].isoformat(),
+                        "birthday": req_body["birthday"].isoformat(),
+                        "nickname": req_body.get("nickname"),
+                    }
+                )
+
+        self.echo_route = EchoRoute
+        self.test_app = flask.Flask(__name__)
+        self.test_app.add_url_rule("/echo", view_func=EchoRoute.as_view("echo"))
+
+    def test_datetime_fields_are_parsed(self):
+        with self.test_app.test_client() as client:
+            response = client.post(
+                "/echo",
+                json={"birthday": "2000.01.02", "since": "2022-11-15T09:30:00+09:00", "nickname": "2000.01.02"},
+            )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.json["since"], "2022-11-15T09:30:00+09:00")
+        self.assertEqual(response.json["birthday"], datetime.datetime(2000, 1, 2).isoformat())
+        # Plain string fields are never parsed, even if they look like a date
+        self.assertEqual(response.json["nickname"], "2000.01.02")
+
+    def test_unparsable_datetime_is_type_mismatch(self):
+        plan = api_class.FieldValidatorPlan(required_fields={"birthday": {"type": "string", "format": "date"}})
+        self.assertEqual(plan.type_check({"birthday": "yesterday"}), ("birthday", "string(date)", "string"))
+
+    def test_format_is_documented(self):
+        doc_data = yaml.safe_load(self.echo_route.post.__doc__)
+        properties = doc_data["requestBody"]["content"]["application/json"]["schema"]["properties"]
+
+        self.assertEqual(properties["birthday"], {"type": "string", "format": "date"})
+        self.assertEqual(properties["since"], {"type": "string", "format": "date-time"})
+        # Body with only unknown fields is reported as required fields omitted, never as empty body
+        self.assertEqual(doc_data["responses"], ["body_required_omitted", "body_invalid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
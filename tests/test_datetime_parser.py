@@ -0,0 +1,64 @@
+import datetime
+import itertools
+import typing
+import unittest
+
+import app.common.utils.datetime_parser as datetime_parser
+
+
+def parse_datetime_legacy(value: str) -> typing.Optional[datetime.datetime]:
+    for format in datetime_parser.POSSIBLE_DATETIME_FORMAT:
+        try:
+            return datetime.datetime.strptime(value, format)
+        except ValueError:
+            continue
+    return None
+
+
+class DatetimeParserTest(unittest.TestCase):
+    """parse_datetime must accept exactly what strptime on POSSIBLE_DATETIME_FORMAT accepts, with the same result."""
+
+    def assertSameWithLegacy(self, values: typing.Iterable[str]):
+        mismatches = []
+        for value in values:
+            expected = parse_datetime_legacy(value)
+            result = datetime_parser.parse_datetime(value)
+            if result != expected or getattr(result, "tzinfo", None) != getattr(expected, "tzinfo", None):
+                mismatches.append((value, expected, result))
+        self.assertEqual(mismatches, [])
+
+    def test_iso_shapes(self):
+        # Includes shapes that fromisoformat accepts but the formats don't, like week dates and 7 fraction digits
+        dates = ("2022-11-15", "2022-1-5", "2022-W46-2")
+        separators = ("T", "t", " ", "_")
+        times = ("", "09", "09:30:00")
+        fractions = ("", ".123", ".1234567", ",5")
+        timezones = ("", "Z", " Z", "+09:00", "+0900", "+09", "+09:00:00", " +0900")
+
+        self.assertSameWithLegacy(
+            date + (separator + time if time else "") + fraction + timezone
+            for date, separator, time, fraction, timezone in itertools.product(
+                dates, separators, times, fractions, timezones
+            )
+        )
+
+    def test_other_shapes(self):
+        self.assertSameWithLegacy(
+            (
+                "",
+                "2022.11.15",
+                "2022/11/15 09:30:00",
+                "2022. 11. 15.",
+                "20221115",
+                "20221115093000",
+                "15/11/2022",
+                "15-Nov-2022 09:30:00",
+                "Tue Nov 15 09:30:00 UTC 2022",
+                "before Nov-2022",
+                "yesterday",
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import flask
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class UsedIdentifierCacheTest(unittest.TestCase):
+    """Available answers must not be cached from a replica that has not caught up with primary yet."""
+
+    def setUp(self):
+        import app.database as db_module
+        import app.database.user as user_module
+
+        self.db_module = db_module
+        self.user_module = user_module
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        primary_url = "sqlite:///" + os.path.join(self.temp_dir.name, "primary.db")
+        # Replica that lags behind primary, which doesn't have any user yet
+        replica_url = "sqlite:///" + os.path.join(self.temp_dir.name, "replica.db")
+
+        self.test_app = flask.Flask(__name__)
+        self.test_app.config["SQLALCHEMY_DATABASE_URI"] = primary_url
+        self.test_app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+        self.test_app.config["SQLALCHEMY_BINDS"] = {f"{db_module.REPLICA_BIND_PREFIX}0": replica_url}
+        self.test_app.config["DB_REPLICA_URLS"] = [replica_url]
+        self.test_app.config["DUPLICATE_CHECK_CACHE_TTL"] = 60
+        db_module.db.init_app(self.test_app)
+
+        self.original_redis_db = user_module.redis_db
+        user_module.redis_db = self.redis_db = fakeredis.FakeStrictRedis()
+
+        with self.test_app.app_context():
+            db = db_module.db
+            for bind_key in (None, f"{db_module.REPLICA_BIND_PREFIX}0"):
+                user_module.User.__table__.create(bind=db.get_engine(bind=bind_key))
+            db.session.execute(
+                user_module.User.__table__.insert().values(
+                    uuid=1,
+                    id="signed_up",
+                    nickname="just_now",
+                    password="-",
+                    email="signed_up@example.com",
+                    last_login_date=db.func.now(),
+                )
+            )
+            db.session.commit()
+
+    def tearDown(self):
+        self.user_module.redis_db = self.original_redis_db
+        with self.test_app.app_context():
+            for bind_key in (None, f"{self.db_module.REPLICA_BIND_PREFIX}0"):
+                self.db_module.db.get_engine(bind=bind_key).dispose()
+        self.temp_dir.cleanup()
+
+    def get_used_identifiers(self, candidates: dict[str, set[str]]) -> dict[str, set[str]]:
+        with self.test_app.test_request_context("/", method="POST"):
+            # Same as duplicate check route, which may be wrapped by read_replica()
+            with self.db_module.read_replica():
+                return self.user_module.User.get_used_identifiers(candidates)
+
+    def test_user_on_primary_only_is_not_cached_as_available(self):
+        used_identifiers = self.get_used_identifiers({"id": {"signed_up", "free_id"}})
+
+        self.assertEqual(used_identifiers, {"id": {"signed_up"}})
+        User = self.user_module.User
+        self.assertFalse(self.redis_db.exists(User.get_available_identifier_redis_key("id", "signed_up")))
+        self.assertTrue(self.redis_db.exists(User.get_available_identifier_redis_key("id", "free_id")))
+
+        # Second check is answered from the cache and DB together, and must still see the user
+        self.assertEqual(self.get_used_identifiers({"id": {"signed_up", "free_id"}}), {"id": {"signed_up"}})
+
+    def test_forget_without_identifiers(self):
+        with self.test_app.app_context():
+            self.user_module.User.forget_available_identifiers()
+            self.user_module.User.forget_available_identifiers(id=None, nickname="")
+
+    def test_forget_removes_the_cached_key(self):
+        User = self.user_module.User
+        self.get_used_identifiers({"nickname": {User.normalize_identifier(" Ne\u0301wNick ")}})
+        cached_key = User.get_available_identifier_redis_key("nickname", "n\u00e9wnick")
+        self.assertTrue(self.redis_db.exists(cached_key))
+
+        with self.test_app.app_context():
+            # Value is given as it's stored on DB, which is not stripped or lowercased on profile update
+            User.forget_available_identifiers(nickname=" NE\u0301WNICK")
+        self.assertFalse(self.redis_db.exists(cached_key))
+
+
+if __name__ == "__main__":
+    unittest.main()
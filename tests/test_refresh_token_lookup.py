@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import flask
+import jwt.exceptions
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+SECRET_KEY = "refresh-token-lookup-test"
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class RefreshTokenLookupTest(unittest.TestCase):
+    """Refresh tokens must be verified against primary, not against a replica that has not caught up yet."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.primary_path = os.path.join(self.temp_dir.name, "primary.db")
+        self.replica_path = os.path.join(self.temp_dir.name, "replica.db")
+
+        self.test_app = flask.Flask(__name__)
+        self.test_app.config["RESTAPI_VERSION"] = "dev"
+        self.test_app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + self.primary_path
+        self.test_app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+        with self.test_app.app_context():
+            # Token classes read the app config on import
+            import app.database as db_module
+            import app.database.jwt as jwt_module
+            import app.database.user as user_module
+
+        self.db_module, self.jwt_module, self.user_module = db_module, jwt_module, user_module
+        self.replica_bind_key = f"{db_module.REPLICA_BIND_PREFIX}0"
+        self.test_app.config["RESTAPI_VERSION"] = jwt_module.TokenBase.api_ver
+        self.test_app.config["SQLALCHEMY_BINDS"] = {self.replica_bind_key: "sqlite:///" + self.replica_path}
+        self.test_app.config["DB_REPLICA_URLS"] = ["sqlite:///" + self.replica_path]
+        db_module.db.init_app(self.test_app)
+
+        self.original_redis_db = jwt_module.token_revocation.redis_db
+        jwt_module.token_revocation.redis_db = self.redis_db = fakeredis.FakeStrictRedis()
+
+        with self.test_app.app_context():
+            db = db_module.db
+            for table in (user_module.User.__table__, jwt_module.RefreshToken.__table__):
+                table.create(bind=db.engine)
+            db.session.execute(
+                user_module.User.__table__.insert().values(
+                    uuid=1,
+                    id="user_id",
+                    nickname="nickname",
+                    password="-",
+                    email="user@example.com",
+                    last_login_date=db.func.now(),
+                )
+            )
+            db.session.commit()
+
+            refresh_token = jwt_module.RefreshToken.from_usertable(db.session.get(user_module.User, 1))
+            refresh_token.user_agent = "test"
+            refresh_token.ip_addr = "127.0.0.1"
+            self.refresh_token_jwt = refresh_token.create_token(SECRET_KEY)
+            self.jti = refresh_token.jti
+            self.dispose_engines()
+
+        # Replica has caught up until here
+        shutil.copyfile(self.primary_path, self.replica_path)
+
+    def tearDown(self):
+        self.jwt_module.token_revocation.redis_db = self.original_redis_db
+        with self.test_app.app_context():
+            self.dispose_engines()
+        self.temp_dir.cleanup()
+
+    def dispose_engines(self):
+        for bind_key in (None, self.replica_bind_key):
+            self.db_module.db.get_engine(bind=bind_key).dispose()
+
+    def update_on_primary(self, statement):
+        with self.test_app.app_context():
+            self.db_module.db.session.execute(statement)
+            self.db_module.db.session.commit()
+
+    def load_refresh_token(self, method: str = "POST"):
+        with self.test_app.test_request_context("/", method=method):
+            refresh_token = self.jwt_module.RefreshToken.from_token(self.refresh_token_jwt, SECRET_KEY)
+            return refresh_token, refresh_token.usertable
+
+    def test_token_deleted_on_primary_is_rejected(self):
+        RefreshToken = self.jwt_module.RefreshToken
+        self.update_on_primary(RefreshToken.__table__.delete().where(RefreshToken.jti == self.jti))
+
+        for method in ("GET", "POST"):
+            with self.assertRaises(jwt.exceptions.InvalidTokenError):
+                self.load_refresh_token(method)
+
+    def test_user_is_loaded_from_primary(self):
+        User = self.user_module.User
+        self.update_on_primary(
+            User.__table__.update().where(User.uuid == 1).values(locked_at=self.db_module.db.func.now())
+        )
+
+        for method in ("GET", "POST"):
+            refresh_token, user = self.load_refresh_token(method)
+            self.assertEqual(refresh_token.jti, self.jti)
+            self.assertIsNotNone(user.locked_at)
+
+    def test_access_token_from_replica_loaded_token_is_rechecked(self):
+        jwt_module = self.jwt_module
+        RefreshToken = jwt_module.RefreshToken
+        revoked_key = jwt_module.token_revocation.RedisKeyType.TOKEN_REVOKE.as_redis_key(str(self.jti))
+        jwt_module.token_revocation.revoke_jti(self.jti)
+        self.update_on_primary(RefreshToken.__table__.delete().where(RefreshToken.jti == self.jti))
+
+        with self.test_app.test_request_context("/", method="GET"):
+            # GET requests read from the replica, which still has the revoked token
+            refresh_token = self.db_module.db.session.query(RefreshToken).filter(RefreshToken.jti == self.jti).one()
+            access_token = jwt_module.AccessToken.from_refresh_token(refresh_token)
+            with self.assertRaisesRegex(Exception, "could not be issued"):
+                access_token.create_token(SECRET_KEY)
+
+        self.assertTrue(self.redis_db.exists(revoked_key))
+
+    def test_access_token_from_verified_token_is_issued(self):
+        jwt_module = self.jwt_module
+
+        with self.test_app.test_request_context("/", method="POST"):
+            refresh_token = jwt_module.RefreshToken.from_token(self.refresh_token_jwt, SECRET_KEY)
+            access_token_jwt = jwt_module.AccessToken.from_refresh_token(refresh_token).create_token(SECRET_KEY)
+
+        self.assertEqual(jwt.decode(access_token_jwt, SECRET_KEY, algorithms="HS256")["jti"], self.jti)
+
+
+if __name__ == "__main__":
+    unittest.main()
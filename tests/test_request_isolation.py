@@ -0,0 +1,89 @@
+import unittest
+import unittest.mock
+
+import eventlet
+import eventlet.event
+import flask
+import flask.views
+
+import app.api.helper_class as api_class
+
+# Gunicorn's eventlet worker runs this many requests at once on one OS thread, by default.
+CONCURRENT_REQUESTS = 500
+BARRIER_TIMEOUT = 10
+
+
+class GreenBarrier:
+    """Cyclic barrier of greenlets. Greenlets share one OS thread, so threading.Barrier would block all of them."""
+
+    def __init__(self, parties: int):
+        self.parties = parties
+        self.waiting = 0
+        self.event = eventlet.event.Event()
+
+    def wait(self):
+        event = self.event
+        self.waiting += 1
+        if self.waiting == self.parties:
+            self.waiting = 0
+            self.event = eventlet.event.Event()
+            event.send()
+            return
+
+        with eventlet.Timeout(BARRIER_TIMEOUT):
+            event.wait()
+
+
+class RequestIsolationTest(unittest.TestCase):
+    """Parsed header, query and body of concurrent requests must not leak into each other."""
+
+    def setUp(self):
+        class EchoRoute(flask.views.MethodView):
+            @api_class.RequestHeader(required_fields={"X-Request-Index": {"type": "string"}})
+            @api_class.RequestQuery(required_fields={"index": {"type": "string"}})
+            @api_class.RequestBody(
+                required_fields={"index": {"type": "integer"}, "name": {"type": "string"}},
+            )
+            def post(self, req_header: dict, req_query: dict, req_body: dict):
+                return flask.jsonify(
+                    {
+                        "header": req_header["X-Request-Index"],
+                        "query": req_query["index"],
+                        "body": req_body,
+                    }
+                )
+
+        self.test_app = flask.Flask(__name__)
+        self.test_app.add_url_rule("/echo", view_func=EchoRoute.as_view("echo"))
+
+    def request(self, index: int) -> dict:
+        with self.test_app.test_client() as client:
+            response = client.post(
+                f"/echo?index={index}",
+                headers={"X-Request-Index": str(index)},
+                json={"index": index, "name": f"request-{index}", "ignored": "not in fields"},
+            )
+            self.assertEqual(response.status_code, 200, response.data)
+            return response.json
+
+    def test_concurrent_requests_see_their_own_data(self):
+        # Every request waits on lacks check, which runs after its data is parsed and before the data is used,
+        # until all requests are parsed. So all of them are in flight there at once, on every decorator.
+        barrier = GreenBarrier(CONCURRENT_REQUESTS)
+        original_lacks = api_class.FieldValidatorPlan.lacks
+
+        def lacks(plan: api_class.FieldValidatorPlan, data: dict):
+            barrier.wait()
+            return original_lacks(plan, data)
+
+        with unittest.mock.patch.object(api_class.FieldValidatorPlan, "lacks", lacks):
+            results = list(eventlet.GreenPool(CONCURRENT_REQUESTS).imap(self.request, range(CONCURRENT_REQUESTS)))
+
+        for index, result in enumerate(results):
+            self.assertEqual(result["header"], str(index))
+            self.assertEqual(result["query"], str(index))
+            self.assertEqual(result["body"], {"index": index, "name": f"request-{index}"})
+
+
+if __name__ == "__main__":
+    unittest.main()
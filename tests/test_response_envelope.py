@@ -0,0 +1,57 @@
+import json
+import unittest
+
+import flask
+
+import app.api.helper_class as api_class
+import app.common.utils.json_provider as json_provider
+
+
+class ResponseEnvelopeCacheTest(unittest.TestCase):
+    """Cached envelopes must never serve another message than the one the response is created with."""
+
+    def setUp(self):
+        self.test_app = flask.Flask(__name__)
+        self.test_app.config["BACKEND_NAME"] = "Test Backend"
+        self.test_app.json = json_provider.create_json_provider(self.test_app)
+        self.response_case = api_class.Response(
+            description="Test response",
+            code=400,
+            success=False,
+            public_sub_code="test.case",
+            message="Default message",
+        )
+
+    def create_response(self, **kwargs) -> dict:
+        with self.test_app.test_request_context("/"):
+            response, code, _ = self.response_case.create_response(**kwargs)
+            self.assertEqual(code, response.status_code)
+            return json.loads(response.get_data())
+
+    def test_message_override_is_not_served_from_cache(self):
+        self.assertEqual(self.create_response()["message"], "Default message")
+        self.assertEqual(self.create_response(message="Overridden")["message"], "Overridden")
+        self.assertEqual(self.create_response(message="Another", data={"k": 1})["message"], "Another")
+        self.assertEqual(self.create_response()["message"], "Default message")
+
+        # Overriding messages are not cached, so the cache stays bounded even with per-request messages
+        self.assertEqual([z[-1] for z in self.response_case._envelope_cache], ["Default message"])
+
+    def test_changed_default_message_is_not_served_from_cache(self):
+        self.assertEqual(self.create_response()["message"], "Default message")
+
+        self.response_case.message = "Changed message"
+        self.assertEqual(self.create_response(data={"k": 1}), self.create_response(data={"k": 1}))
+        self.assertEqual(self.create_response()["message"], "Changed message")
+
+    def test_body_is_same_with_jsonify(self):
+        data = {"k": [1, "v"]}
+        expected = {"success": False, "code": 400, "sub_code": "test.case", "message": "Overridden", "data": data}
+
+        self.assertEqual(self.create_response(message="Overridden", data=data), expected)
+        self.test_app.debug = True
+        self.assertEqual(self.create_response(message="Overridden", data=data), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+import unittest
+
+import flask
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class RevocationIndexTest(unittest.TestCase):
+    def setUp(self):
+        test_app = flask.Flask(__name__)
+        test_app.config["TOKEN_REVOKE_FEED_ENABLE"] = True
+        self.app_context = test_app.app_context()
+        self.app_context.push()
+
+        import app.database.token_revocation as token_revocation
+
+        self.token_revocation = token_revocation
+        self.original_redis_db = token_revocation.redis_db
+        token_revocation.redis_db = self.redis_db = fakeredis.FakeStrictRedis()
+
+    def tearDown(self):
+        self.token_revocation.redis_db = self.original_redis_db
+        self.app_context.pop()
+
+    def test_bootstrap_with_index_already_present(self):
+        token_revocation = self.token_revocation
+
+        # Revocation made before the index was introduced, which only has the key of its JTI
+        legacy_key = token_revocation.RedisKeyType.TOKEN_REVOKE.as_redis_key("3")
+        self.redis_db.set(legacy_key, "revoked", token_revocation.TOKEN_REVOKE_DURATION)
+        # Revocations after that create the index, before the first bootstrap builds it
+        token_revocation.revoke_jti(1, 2)
+        self.assertFalse(self.redis_db.exists(token_revocation.TOKEN_REVOKE_INDEX_BUILT))
+
+        revocation_set = token_revocation.RevocationSet(enabled=True)
+        revocation_set.bootstrap()
+
+        self.assertEqual(set(revocation_set.revoked), {1, 2, 3})
+        self.assertTrue(all(expire_time > time.time() for expire_time in revocation_set.revoked.values()))
+        self.assertTrue(self.redis_db.exists(token_revocation.TOKEN_REVOKE_INDEX_BUILT))
+
+    def test_reindex_skips_non_jti_keys(self):
+        token_revocation = self.token_revocation
+
+        token_revocation.revoke_jti(1)
+        self.redis_db.set(token_revocation.TOKEN_REVOKE_INDEX_BUILT, "1")
+
+        self.assertEqual(token_revocation.build_revocation_index(), 1)
+        self.assertEqual(self.redis_db.zcard(token_revocation.TOKEN_REVOKE_INDEX), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()